@@ -6,6 +6,7 @@ class ApiConfig(AppConfig):
     name = "api"
     
     def ready(self):
+        import api.checks
         import api.signals
         # Remove background task initialization from here
         # It will be called from entrypoint.sh after migrations
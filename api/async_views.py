@@ -0,0 +1,127 @@
+"""
+Async versions of the hottest read endpoints, mounted under /api/async/ and meant for the ASGI entry point
+(SERVER_MODE=asgi). They return the same JSON as their DRF counterparts but await the database and the cache
+through the async ORM and cache APIs instead of holding a worker thread, so one process can keep many concurrent
+feed requests in flight. Nothing blocking runs on the event loop.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET
+from rest_framework import exceptions
+from rest_framework.request import Request
+
+from conf.utils import CachedTokenAuthentication
+from .cache import afeed_page_key
+from .conditional import afeed_validators, areference_data_validators
+from .filters import parse_id_list
+from .pagination import KeysetPagination
+from .refdata import aget_reference_data
+from .serializers import ArticleListSerializer
+from .views import FEED_CURSOR_ORDERING, ArticlePagination, get_feed_queryset
+
+# DRF's JSONRenderer defaults, so both stacks return byte-identical bodies
+JSON_DUMPS_PARAMS = {"ensure_ascii": False, "separators": (",", ":")}
+
+
+def json_response(data, status=200, headers=None):
+    return JsonResponse(data, status=status, headers=headers, safe=False, json_dumps_params=JSON_DUMPS_PARAMS)
+
+
+async def authenticate(request):
+    """The token header handling of DRF's TokenAuthentication, backed by the same credentials cache."""
+    auth = request.headers.get("Authorization", "").split()
+    if not auth or auth[0].lower() != "token":
+        raise exceptions.NotAuthenticated()
+    if len(auth) != 2:
+        raise exceptions.AuthenticationFailed("Invalid token header. Token string should not contain spaces.")
+
+    user, _ = await CachedTokenAuthentication().aauthenticate_credentials(auth[1])
+    return user
+
+
+def async_condition(validators):
+    """
+    django.views.decorators.http.condition for async views whose validators await the cache.
+    ``validators(request)`` returns the (ETag, Last-Modified) pair of the resource.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            etag, last_modified = await validators(request)
+            last_modified = int(last_modified.timestamp())
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD"):
+                if not response.has_header("Last-Modified"):
+                    response.headers["Last-Modified"] = http_date(last_modified)
+                response.headers.setdefault("ETag", etag)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def async_api_view(view):
+    """GET-only, token-authenticated async view that renders API exceptions the way DRF does."""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            request.user = await authenticate(request)
+            return await view(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            headers = None
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                headers = {"WWW-Authenticate": "Token"}
+            return json_response({"detail": exc.detail}, status=exc.status_code, headers=headers)
+
+    return require_GET(wrapper)
+
+
+@async_api_view
+@async_condition(afeed_validators)
+async def personalized_feed(request):
+    user = request.user
+    cache_key = await afeed_page_key(user.id, request)
+    data = await cache.aget(cache_key)
+    if data is None:
+        data = await render_feed(Request(request), user)
+        await cache.aset(cache_key, data, settings.FEED_CACHE_TIMEOUT)
+    return json_response(data)
+
+
+async def render_feed(request, user):
+    params = request.query_params
+    if "cursor" in params or params.get("pagination") == "cursor":
+        paginator = KeysetPagination()
+        paginator.ordering = FEED_CURSOR_ORDERING
+    else:
+        paginator = ArticlePagination()
+
+    rows = await paginator.apaginate_queryset(get_feed_queryset(request, user), request)
+    data = paginator.get_paginated_response(ArticleListSerializer(rows, many=True).data).data
+    return {**data, "results": list(data["results"])}
+
+
+@async_api_view
+@async_condition(areference_data_validators)
+async def country_list(request):
+    return json_response((await aget_reference_data()).countries)
+
+
+@async_api_view
+@async_condition(areference_data_validators)
+async def source_list(request):
+    reference_data = await aget_reference_data()
+    country_ids = parse_id_list(request.GET.get("country_id"))
+    if country_ids:
+        return json_response(reference_data.sources_in_countries(set(country_ids)))
+    return json_response(reference_data.sources)
@@ -4,6 +4,7 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.authtoken.models import Token
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 from .models import User
 from .serializers import EmailAuthTokenSerializer, UserRegistrationWithEmailSerializer
@@ -63,7 +64,8 @@ class AuthViewSet(viewsets.ModelViewSet):
             'firstLogin': first_login
         })
 
-    @action(detail=False, methods=['post'])
+    # Unlike the other actions, logout has to know whose token to delete
+    @action(detail=False, methods=['post'], authentication_classes=api_settings.DEFAULT_AUTHENTICATION_CLASSES)
     def logout(self, request):
         if request.user.is_authenticated:
             Token.objects.filter(user=request.user).delete()
@@ -0,0 +1,55 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+
+from .refdata import aget_reference_data_version, get_reference_data_version
+
+FEED_VERSION_KEY = "feed:version:{user_id}"
+# Pages embed each article's source, so they are keyed by the same two stamps as the feed ETag
+FEED_PAGE_KEY = "feed:page:{user_id}:{version}:{refdata_version}:{request_hash}"
+
+
+def get_feed_version(user_id):
+    """
+    Returns the user's feed version. Cached pages are keyed by it, so bumping the version invalidates all of
+    them at once without finding or deleting any.
+    """
+    key = FEED_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        # A fresh stamp rather than 0, so pages cached under an evicted version are never served again
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_feed_version(user_id):
+    """get_feed_version for async views, through the async cache API."""
+    key = FEED_VERSION_KEY.format(user_id=user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_feed_versions(user_ids):
+    """Invalidates the cached feed pages of the given users in one cache round trip."""
+    stamp = time.time_ns()
+    cache.set_many({FEED_VERSION_KEY.format(user_id=user_id): stamp for user_id in user_ids}, timeout=None)
+
+
+def feed_page_key(user_id, request):
+    return make_feed_page_key(user_id, request, get_feed_version(user_id), get_reference_data_version())
+
+
+async def afeed_page_key(user_id, request):
+    return make_feed_page_key(user_id, request, await aget_feed_version(user_id), await aget_reference_data_version())
+
+
+def make_feed_page_key(user_id, request, version, refdata_version):
+    request_hash = hashlib.sha256(request.build_absolute_uri().encode()).hexdigest()
+    return FEED_PAGE_KEY.format(
+        user_id=user_id, version=version, refdata_version=refdata_version, request_hash=request_hash
+    )
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Backends whose entries only the process that wrote them can see
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            f"The default cache ({backend}) is not shared between processes.",
+            hint=(
+                "Feed and reference-data version stamps and cached tokens are written by one process (a web "
+                "worker, process_tasks) and read by the others. Set CACHE_URL to Redis, or leave CACHES to the "
+                "file-based default of conf.settings. Tests run in a single process and may use local memory."
+            ),
+            id="api.W001",
+        )
+    ]
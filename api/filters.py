@@ -1,4 +1,12 @@
-from django.db.models import QuerySet, Q
+from datetime import datetime, time, timedelta
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connections
+from django.db.models import F, QuerySet, Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
 from rest_framework import filters
 from rest_framework.request import Request
 import django_filters
@@ -14,6 +22,39 @@ class PrimaryKeyFilterBackend(filters.BaseFilterBackend):
         return queryset
 
 
+SEARCH_CONFIG = "english"
+
+
+def parse_id_list(value):
+    """Parses a comma-separated id list such as ``"1, 2,x"``, skipping anything that is not a number."""
+    if not value:
+        return []
+    return [int(id.strip()) for id in value.split(',') if id.strip().isdigit()]
+
+
+def search_articles(queryset, terms, search_type="websearch", rank=False):
+    """
+    Keeps the articles matching any of the terms. On PostgreSQL this is an ``@@`` match against the indexed
+    ``search_vector`` column (see migration 0012), optionally ordered by ``ts_rank``; elsewhere it falls back
+    to ``icontains`` on the title and summary.
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        q_objects = Q()
+        for term in terms:
+            q_objects |= Q(title__icontains=term) | Q(summary__icontains=term)
+        return queryset.filter(q_objects)
+
+    query = reduce(or_, (SearchQuery(term, config=SEARCH_CONFIG, search_type=search_type) for term in terms))
+    queryset = queryset.alias(
+        search_vector=RawSQL('"api_article"."search_vector"', [], output_field=SearchVectorField())
+    ).filter(search_vector=query)
+    if rank:
+        queryset = queryset.annotate(search_rank=SearchRank(F("search_vector"), query)).order_by(
+            "-search_rank", "-published_at"
+        )
+    return queryset
+
+
 class ArticleFilter(django_filters.FilterSet):
     
     source_name = django_filters.CharFilter(
@@ -23,10 +64,14 @@ class ArticleFilter(django_filters.FilterSet):
     )
     
     published_at = django_filters.DateFilter(
-        field_name='published_at__date',
+        method='filter_published_date',
         label='Filter by exact publication date'
     )
 
+    search = django_filters.CharFilter(
+        method='filter_search',
+        label='Full-text search in title and summary, best matches first'
+    )
 
     class Meta:
         model = Article
@@ -36,15 +81,25 @@ class ArticleFilter(django_filters.FilterSet):
             'source_name': ['exact', 'icontains'],
         }
 
-    def filter_search(self, queryset, name, value):
+    def filter_published_date(self, queryset, name, value):
+        # A range on the raw column can use the published_at index, unlike published_at__date
         if value:
-            return queryset.filter(
-                Q(title__icontains=value) | Q(summary__icontains=value)
-            )
+            start = timezone.make_aware(datetime.combine(value, time.min))
+            return queryset.filter(published_at__gte=start, published_at__lt=start + timedelta(days=1))
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        if value and value.strip():
+            return search_articles(queryset, [value.strip()], rank=True)
         return queryset
 
 
 class PersonalizedFeedFilter(ArticleFilter):
+    search = django_filters.CharFilter(
+        method='filter_search',
+        label='Full-text search in title and summary'
+    )
+
     keywords = django_filters.CharFilter(
         method='filter_keywords',
         label='Filter by user preference keywords'
@@ -55,13 +110,17 @@ class PersonalizedFeedFilter(ArticleFilter):
         label='Show only articles from preferred source ID'
     )
 
+    def filter_search(self, queryset, name, value):
+        # Not ranked: the feed keeps its chronological order, which is also the order its cursors page through
+        if value and value.strip():
+            return search_articles(queryset, [value.strip()])
+        return queryset
+
     def filter_keywords(self, queryset, name, value):
-        if value:
-            keywords = [k.strip() for k in value.split(',')]
-            q_objects = Q()
-            for keyword in keywords:
-                q_objects |= Q(title__icontains=keyword) | Q(summary__icontains=keyword)
-            return queryset.filter(q_objects)
+        keywords = [k.strip() for k in value.split(',') if k.strip()] if value else []
+        if keywords:
+            # The feed keeps its chronological order, so keywords only filter and are not ranked
+            return search_articles(queryset, keywords, search_type='phrase')
         return queryset
 
     def filter_preferred_sources(self, queryset, name, value):
@@ -82,8 +141,7 @@ class SourceFilter(django_filters.FilterSet):
         fields = []
 
     def filter_by_country_ids(self, queryset, name, value):
-        if value:
-            country_ids = [int(id.strip()) for id in value.split(',') if id.strip().isdigit()]
-            if country_ids:
-                return queryset.filter(country__id__in=country_ids)
+        country_ids = parse_id_list(value)
+        if country_ids:
+            return queryset.filter(country__id__in=country_ids)
         return queryset
@@ -0,0 +1,93 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Article, Country, Source
+from api.serializers import ArticleListSerializer, ArticleSerializer
+from api.utils import rolled_back
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks ArticleSerializer on model instances against ArticleListSerializer on values() rows at "
+        "list page sizes. Seeds articles inside a transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-sizes", type=int, nargs="+", default=[20, 100])
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.seed(max(options["page_sizes"]))
+            self.run(options["page_sizes"], options["repeat"])
+
+    def seed(self, count):
+        country = Country.objects.create(name="Benchland", code="zz")
+        sources = [
+            Source.objects.create(
+                api_id=f"bench-source-{i}",
+                name=f"Bench Source {i}",
+                description="A source seeded by bench_article_serializer",
+                url=f"https://bench-{i}.example.com",
+                category="general",
+                language="en",
+                country=country if i % 2 else None,
+            )
+            for i in range(10)
+        ]
+        now = timezone.now()
+        Article.objects.bulk_create(
+            Article(
+                title=f"Bench article {i}",
+                summary="Seeded for the serializer benchmark " * 4,
+                article_url=f"https://bench.example.com/{i}",
+                source_name=sources[i % len(sources)].name,
+                source=sources[i % len(sources)] if i % 7 else None,
+                image_url=f"https://bench.example.com/{i}.png",
+                published_at=now - timedelta(minutes=i),
+            )
+            for i in range(count)
+        )
+
+    def run(self, page_sizes, repeat):
+        renderer = JSONRenderer()
+        self.stdout.write(
+            f"{'page size':>10} {'impl':>6} {'serialize (ms)':>15} {'query + serialize (ms)':>23} {'identical':>10}"
+        )
+
+        for page_size in page_sizes:
+            instances = list(Article.objects.select_related("source__country")[:page_size])
+            rows = list(Article.objects.values(*ArticleListSerializer.values)[:page_size])
+            expected = renderer.render(ArticleSerializer(instances, many=True).data)
+            identical = renderer.render(ArticleListSerializer(rows, many=True).data) == expected
+
+            instance_queryset = Article.objects.select_related("source__country")[:page_size]
+            values_queryset = Article.objects.values(*ArticleListSerializer.values)[:page_size]
+            implementations = (
+                (
+                    "drf",
+                    lambda: ArticleSerializer(instances, many=True).data,
+                    lambda: ArticleSerializer(instance_queryset.all(), many=True).data,
+                ),
+                (
+                    "lean",
+                    lambda: ArticleListSerializer(rows, many=True).data,
+                    lambda: ArticleListSerializer(values_queryset.all(), many=True).data,
+                ),
+            )
+            for name, serialize, query_and_serialize in implementations:
+                self.stdout.write(
+                    f"{page_size:>10} {name:>6} {self.time(serialize, repeat) * 1000:>15.3f} "
+                    f"{self.time(query_and_serialize, repeat) * 1000:>23.3f} {str(identical):>10}"
+                )
+
+    @staticmethod
+    def time(function, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        return (time.perf_counter() - started) / repeat
@@ -0,0 +1,142 @@
+import asyncio
+import math
+import time
+
+from django.core.management.base import CommandError
+
+from api.management.commands.loadtest_feed import PAGE_SIZE, Command as LoadTestCommand
+
+SERVERS = (
+    # (name, feed path, environment of the gunicorn process)
+    ("sync", "/api/articles/personalized-feed/", {}),
+    ("async", "/api/async/articles/personalized-feed/", {"SERVER_MODE": "asgi"}),
+)
+
+
+class Command(LoadTestCommand):
+    help = (
+        "Compares the sync DRF personalized feed under a gthread worker with the async view under a uvicorn worker, "
+        "each served by a single gunicorn worker process, at 50/200/1000 concurrent clients. Feed caching is off by "
+        "default so every request reaches the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, nargs="+", default=[50, 200, 1000])
+        parser.add_argument("--threads", type=int, default=8, help="Threads of the sync worker")
+        parser.add_argument("--duration", type=float, default=10, help="Seconds measured per client count")
+        parser.add_argument("--pages", type=int, default=5, help="Feed pages the clients cycle through")
+        parser.add_argument("--username", default="loadtest", help="Must not exist yet; deleted afterwards")
+        parser.add_argument("--articles", type=int, default=500, help="Newest articles linked to the user")
+        parser.add_argument("--feed-cache-timeout", default="0", help="FEED_CACHE_TIMEOUT of the servers")
+
+    def run_all(self, options, token, linked):
+        pages = max(1, min(options["pages"], math.ceil(linked / PAGE_SIZE)))
+
+        self.stdout.write(
+            f"{'view':>6} {'clients':>8} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9}"
+        )
+        for name, path, env in SERVERS:
+            port = self.free_port()
+            env = {
+                **env,
+                "FEED_CACHE_TIMEOUT": options["feed_cache_timeout"],
+                "WEB_WORKER_CONNECTIONS": str(max(options["clients"]) * 2),
+            }
+            server = self.start_server(port, 1, options["threads"], env=env)
+            try:
+                self.wait_until_ready(f"http://127.0.0.1:{port}", server)
+                for clients in options["clients"]:
+                    result = asyncio.run(self.load(port, path, token, clients, options["duration"], pages))
+                    self.stdout.write(
+                        f"{name:>6} {clients:>8} {result['requests']:>9} {result['errors']:>7} "
+                        f"{result['rps']:>8.1f} {result['p50'] * 1000:>9.1f} {result['p99'] * 1000:>9.1f}"
+                    )
+            finally:
+                self.stop_server(server)
+
+    async def load(self, port, path, token, clients, duration, pages):
+        """
+        Runs ``clients`` keep-alive connections on one event loop, so the load generator itself does not need a
+        thread per client at 1000 clients.
+        """
+        latencies = []
+        errors = 0
+        warmed = 0
+        clock = {}
+        all_warmed = asyncio.Event()
+        start = asyncio.Event()
+
+        async def client(index):
+            nonlocal errors, warmed
+            connection = None
+            # Connection setup and the first request are not measured
+            try:
+                connection, _ = await self.request(connection, port, path, token, 1)
+            except (OSError, asyncio.IncompleteReadError):
+                connection = None
+            warmed += 1
+            if warmed == clients:
+                all_warmed.set()
+            await start.wait()
+
+            request_number = index
+            while time.perf_counter() < clock["deadline"]:
+                started = time.perf_counter()
+                try:
+                    connection, status = await self.request(connection, port, path, token, request_number % pages + 1)
+                    ok = status == 200
+                except (OSError, asyncio.IncompleteReadError):
+                    if connection:
+                        connection[1].close()
+                    connection, ok = None, False
+                latencies.append(time.perf_counter() - started)
+                errors += not ok
+                request_number += clients
+
+            if connection:
+                connection[1].close()
+
+        tasks = [asyncio.create_task(client(index)) for index in range(clients)]
+        await all_warmed.wait()
+        clock["started"] = time.perf_counter()
+        clock["deadline"] = clock["started"] + duration
+        start.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - clock["started"]
+
+        latencies.sort()
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "rps": len(latencies) / elapsed,
+            "p50": self.percentile(latencies, 0.50),
+            "p99": self.percentile(latencies, 0.99),
+        }
+
+    @staticmethod
+    async def request(connection, port, path, token, page):
+        """Sends one GET over a keep-alive connection, opening one if needed; returns the connection and status."""
+        if connection is None:
+            connection = await asyncio.open_connection("127.0.0.1", port)
+        reader, writer = connection
+        writer.write(
+            f"GET {path}?page={page}&page_size={PAGE_SIZE} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+            f"Authorization: Token {token}\r\n\r\n".encode()
+        )
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server")
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if "content-length" not in headers:
+            raise CommandError("The benchmark client only reads responses with a Content-Length")
+        await reader.readexactly(int(headers["content-length"]))
+
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+            connection = None
+        return connection, int(status_line.split()[1])
@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from api.management.commands.fetch_news import Command as FetchNewsCommand
+
+
+class StubNewsAPIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, latency, articles_per_page):
+        super().__init__(("127.0.0.1", 0), StubNewsAPIHandler)
+        self.latency = latency
+        self.articles_per_page = articles_per_page
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v2"
+
+
+class StubNewsAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+
+        params = parse_qs(urlparse(self.path).query)
+        query = params.get("q", [""])[0]
+        sources = params.get("sources", [""])[0]
+        articles = [
+            {
+                "source": {"id": sources.split(",")[0], "name": "Stub"},
+                "title": f"{query} {i}",
+                "description": f"Stub article {i}",
+                "url": f"https://stub.example.com/{abs(hash((query, sources)))}/{i}",
+                "urlToImage": None,
+                "publishedAt": "2025-01-01T00:00:00Z",
+            }
+            for i in range(self.server.articles_per_page)
+        ]
+        body = json.dumps({"status": "ok", "totalResults": len(articles), "articles": articles}).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the fetch_news fetch engine against a local stub NewsAPI server. Reads fetch cursors and "
+        "recent article URLs from the configured database but writes nothing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--countries", type=int, default=30)
+        parser.add_argument("--batches", type=int, default=4, help="Keyword batches per country")
+        parser.add_argument("--latency", type=float, default=0.2, help="Stub response latency in seconds")
+        parser.add_argument("--articles", type=int, default=20, help="Articles per stub response")
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+
+    def handle(self, *args, **options):
+        server = StubNewsAPIServer(options["latency"], options["articles"])
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        country_data = {
+            f"c{c}": {
+                "users": [],
+                "sources": [f"source-{c}"],
+                "keyword_batches": [[f"keyword-{c}-{b}"] for b in range(options["batches"])],
+            }
+            for c in range(options["countries"])
+        }
+        requests_per_run = options["countries"] * options["batches"]
+        fetcher = FetchNewsCommand()
+
+        self.stdout.write(
+            f"{requests_per_run} requests per run, {options['latency'] * 1000:.0f}ms stub latency\n"
+            f"{'concurrency':>12} {'wall clock (s)':>15} {'articles':>10}"
+        )
+        try:
+            with override_settings(
+                NEWSAPI_BASE_URL=server.base_url,
+                NEWSAPI_KEY="bench",
+                NEWSAPI_POOL_SIZE=max(options["concurrency"]),
+            ):
+                for concurrency in options["concurrency"]:
+                    started = time.perf_counter()
+                    articles = sum(len(page) for page in fetcher.iter_article_pages(country_data, concurrency, {}))
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(f"{concurrency:>12} {elapsed:>15.3f} {articles:>10}")
+        finally:
+            server.shutdown()
+            server.server_close()
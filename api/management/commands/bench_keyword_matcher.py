@@ -0,0 +1,55 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.routing import KeywordMatcher
+
+
+def random_word(rng, min_length=4, max_length=12):
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(min_length, max_length)))
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the Aho-Corasick keyword matcher against per-keyword substring checks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keywords", type=int, nargs="+", default=[1000, 10000, 100000])
+        parser.add_argument("--articles", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'keywords':>10} {'build (s)':>10} {'naive/article (ms)':>19} {'matcher/article (ms)':>21}"
+        )
+
+        for keyword_count in options["keywords"]:
+            rng = random.Random(options["seed"])
+            keywords = list({random_word(rng) for _ in range(keyword_count)})
+            articles = [
+                " ".join(
+                    rng.choice(keywords) if rng.random() < 0.05 else random_word(rng, 2, 9) for _ in range(80)
+                )
+                for _ in range(options["articles"])
+            ]
+
+            started = time.perf_counter()
+            matcher = KeywordMatcher(keywords)
+            build_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            naive_results = [{i for i, keyword in enumerate(keywords) if keyword in text} for text in articles]
+            naive_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            matcher_results = [matcher.match(text) for text in articles]
+            matcher_time = time.perf_counter() - started
+
+            if naive_results != matcher_results:
+                self.stderr.write(f"Result mismatch at {keyword_count} keywords")
+
+            self.stdout.write(
+                f"{len(keywords):>10} {build_time:>10.3f} "
+                f"{naive_time / len(articles) * 1000:>19.3f} {matcher_time / len(articles) * 1000:>21.3f}"
+            )
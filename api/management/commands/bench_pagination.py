@@ -0,0 +1,76 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import Article
+from api.pagination import KeysetPagination
+from api.utils import chunked, rolled_back
+from api.views import ArticlePagination
+
+SEED_BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks page-number against keyset pagination of the article list at increasing depths. Seeds "
+        "articles inside a transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--articles", type=int, default=1000000)
+        parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.seed(options["articles"])
+            self.run(options["pages"], options["repeat"])
+
+    def seed(self, count):
+        started = time.perf_counter()
+        now = timezone.now()
+        articles = (
+            Article(
+                title=f"Bench article {i}",
+                article_url=f"https://bench.example.com/{i}",
+                # Several articles per second, so paging has to break ties on id
+                published_at=now - timedelta(seconds=i // 4),
+            )
+            for i in range(count)
+        )
+        for batch in chunked(articles, SEED_BATCH_SIZE):
+            Article.objects.bulk_create(batch)
+        self.stdout.write(f"Seeded {count} articles in {time.perf_counter() - started:.1f}s")
+
+    def run(self, pages, repeat):
+        factory = APIRequestFactory()
+        queryset = Article.objects.all()
+        page_size = ArticlePagination.page_size
+
+        self.stdout.write(f"{'page':>8} {'page number (ms)':>17} {'keyset (ms)':>12}")
+        for page in pages:
+            request = Request(factory.get("/api/articles/", {"page": page}))
+            page_number_time = self.time(lambda: list(ArticlePagination().paginate_queryset(queryset, request)), repeat)
+
+            # The keyset cursor for page N points at the last row of page N - 1
+            params = {}
+            if page > 1:
+                boundary = queryset.order_by("-published_at", "-id")[(page - 1) * page_size - 1]
+                params["cursor"] = KeysetPagination.make_cursor([boundary.published_at, boundary.id])
+            request = Request(factory.get("/api/articles/", params))
+            keyset_time = self.time(lambda: KeysetPagination().paginate_queryset(queryset, request), repeat)
+
+            self.stdout.write(f"{page:>8} {page_number_time * 1000:>17.2f} {keyset_time * 1000:>12.2f}")
+
+    @staticmethod
+    def time(paginate, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            paginate()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
@@ -0,0 +1,100 @@
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from api.routing import KeywordMatcher, RoutingIndex
+
+
+class SetRouting:
+    """The per-article set algebra fetch_news used before RoutingIndex, kept as the baseline."""
+
+    def __init__(self, users):
+        self.users_by_source = defaultdict(set)
+        self.users_by_keyword = defaultdict(set)
+        self.users_with_no_sources = set()
+        self.users_with_no_keywords = set()
+
+        for user_id, source_api_ids, keywords in users:
+            if source_api_ids:
+                for source_api_id in source_api_ids:
+                    self.users_by_source[source_api_id].add(user_id)
+            else:
+                self.users_with_no_sources.add(user_id)
+
+            keywords = [kw.lower().strip() for kw in keywords if kw and kw.strip()]
+            if keywords:
+                for keyword in keywords:
+                    self.users_by_keyword[keyword].add(user_id)
+            else:
+                self.users_with_no_keywords.add(user_id)
+
+        self.keyword_matcher = KeywordMatcher(self.users_by_keyword)
+
+    def match(self, source_api_id, text):
+        source_matching_users = set()
+        if source_api_id and source_api_id in self.users_by_source:
+            source_matching_users.update(self.users_by_source[source_api_id])
+        source_matching_users.update(self.users_with_no_sources)
+
+        keyword_matching_users = set()
+        for keyword_id in self.keyword_matcher.match(text):
+            keyword_matching_users.update(self.users_by_keyword[self.keyword_matcher.keywords[keyword_id]])
+        keyword_matching_users.update(self.users_with_no_keywords)
+
+        return source_matching_users & keyword_matching_users
+
+
+class Command(BaseCommand):
+    help = "Benchmarks per-article user routing with bitmaps against Python sets"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, nargs="+", default=[10000, 100000, 300000])
+        parser.add_argument("--sources", type=int, default=50)
+        parser.add_argument("--articles", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'users':>8} {'impl':>7} {'build (s)':>10} {'per article (ms)':>17} {'peak per article (KiB)':>23}"
+        )
+
+        for user_count in options["users"]:
+            rng = random.Random(options["seed"])
+            sources = [f"source-{i}" for i in range(options["sources"])]
+            users = [
+                (
+                    user_id,
+                    rng.sample(sources, rng.randint(0, 3)),
+                    ["car", "automobile"] if rng.random() < 0.7 else [f"kw{rng.randint(0, user_count)}"],
+                )
+                for user_id in range(1, user_count + 1)
+            ]
+            articles = [
+                (rng.choice(sources), f"car news kw{rng.randint(0, user_count)} kw{rng.randint(0, user_count)}")
+                for _ in range(options["articles"])
+            ]
+
+            for name, implementation in (("sets", SetRouting), ("bitmap", RoutingIndex)):
+                started = time.perf_counter()
+                routing = implementation(users)
+                build_time = time.perf_counter() - started
+
+                started = time.perf_counter()
+                for source_api_id, text in articles:
+                    routing.match(source_api_id, text)
+                elapsed = time.perf_counter() - started
+
+                tracemalloc.start()
+                for source_api_id, text in articles[:20]:
+                    tracemalloc.reset_peak()
+                    routing.match(source_api_id, text)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                self.stdout.write(
+                    f"{user_count:>8} {name:>7} {build_time:>10.3f} "
+                    f"{elapsed / len(articles) * 1000:>17.3f} {peak / 1024:>23.1f}"
+                )
@@ -0,0 +1,102 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Country, Source, UserPreference
+from api.routing import RoutingSnapshot
+from api.utils import chunked, rolled_back
+
+SEED_BATCH_SIZE = 5000
+
+User = get_user_model()
+
+
+def load_with_prefetch():
+    """How fetch_news read preferences before RoutingSnapshot, kept as the baseline."""
+    preferences = list(
+        UserPreference.objects.select_related("user").prefetch_related("preferred_countries", "preferred_sources")
+    )
+    routes = []
+    for pref in preferences:
+        countries = [(country.id, country.code) for country in pref.preferred_countries.all()]
+        sources = [(source.api_id, source.country_id) for source in pref.preferred_sources.all()]
+        routes.append((pref.user.id, pref.user.username, countries, sources, pref.keywords))
+    return routes
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks building the fetch_news routing snapshot from flat through-table queries against the "
+        "prefetch_related walk it replaced. Seeds users inside a transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, nargs="+", default=[10000, 100000])
+        parser.add_argument("--countries", type=int, default=30)
+        parser.add_argument("--sources", type=int, default=150)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'users':>8} {'impl':>9} {'build (s)':>10} {'queries':>8}")
+
+        for user_count in options["users"]:
+            with rolled_back():
+                self.seed(user_count, options["countries"], options["sources"], random.Random(options["seed"]))
+                self.run(user_count, options["repeat"])
+
+    def seed(self, user_count, country_count, source_count, rng):
+        Country.objects.bulk_create(
+            Country(name=f"Bench country {i}", code=f"{chr(97 + i // 26)}{chr(97 + i % 26)}")
+            for i in range(country_count)
+        )
+        # bulk_create does not return primary keys on every backend, so they are read back
+        countries = list(Country.objects.filter(name__startswith="Bench country "))
+        Source.objects.bulk_create(
+            Source(api_id=f"bench-source-{i}", name=f"Bench source {i}", country=countries[i % len(countries)])
+            for i in range(source_count)
+        )
+        sources = list(Source.objects.filter(api_id__startswith="bench-source-"))
+
+        users = (User(username=f"bench-user-{i}", password="!") for i in range(user_count))
+        for batch in chunked(users, SEED_BATCH_SIZE):
+            User.objects.bulk_create(batch)
+        user_ids = User.objects.filter(username__startswith="bench-user-").values_list("id", flat=True)
+        preferences = (
+            UserPreference(user_id=user_id, keywords=rng.sample(["car", "ev", "truck", "bike", "race"], 2))
+            for user_id in user_ids.iterator()
+        )
+        for batch in chunked(preferences, SEED_BATCH_SIZE):
+            UserPreference.objects.bulk_create(batch)
+
+        country_links = UserPreference.preferred_countries.through
+        source_links = UserPreference.preferred_sources.through
+        preference_ids = UserPreference.objects.filter(user__username__startswith="bench-user-").values_list(
+            "id", flat=True
+        )
+        for batch in chunked(preference_ids.iterator(), SEED_BATCH_SIZE):
+            country_links.objects.bulk_create(
+                country_links(userpreference_id=preference_id, country_id=country.id)
+                for preference_id in batch
+                for country in rng.sample(countries, rng.randint(1, 2))
+            )
+            source_links.objects.bulk_create(
+                source_links(userpreference_id=preference_id, source_id=source.id)
+                for preference_id in batch
+                for source in rng.sample(sources, rng.randint(1, 4))
+            )
+
+    def run(self, user_count, repeat):
+        implementations = (("prefetch", load_with_prefetch), ("snapshot", RoutingSnapshot.load))
+        for name, load in implementations:
+            timings = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    load()
+                    timings.append(time.perf_counter() - started)
+            self.stdout.write(f"{user_count:>8} {name:>9} {min(timings):>10.3f} {len(captured):>8}")
@@ -0,0 +1,87 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from api.models import Article
+from api.utils import chunked, rolled_back
+
+SEED_BATCH_SIZE = 10000
+SOURCE_NAMES = ["BBC News", "CNN", "Reuters", "Associated Press", "The Verge", "Wired", "Ars Technica", "NZ Herald"]
+WORDS = ["electric", "car", "market", "battery", "election", "storm", "league", "launch", "merger", "review"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks icontains filters on Article.source_name and Article.title with and without the pg_trgm "
+        "indexes. PostgreSQL only; seeds articles inside a transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--articles", type=int, default=1000000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Trigram indexes only exist on PostgreSQL")
+
+        with rolled_back():
+            self.seed(options["articles"], random.Random(options["seed"]))
+            self.run(options["repeat"])
+
+    def seed(self, count, rng):
+        started = time.perf_counter()
+        now = timezone.now()
+        articles = (
+            Article(
+                title=" ".join(rng.choices(WORDS, k=6)) + f" {i}",
+                source_name=rng.choice(SOURCE_NAMES),
+                article_url=f"https://bench.example.com/{i}",
+                published_at=now - timedelta(seconds=i),
+            )
+            for i in range(count)
+        )
+        for batch in chunked(articles, SEED_BATCH_SIZE):
+            Article.objects.bulk_create(batch)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE api_article")
+        self.stdout.write(f"Seeded {count} articles in {time.perf_counter() - started:.1f}s")
+
+    def run(self, repeat):
+        lookups = [
+            ("source_name", "herald"),
+            ("source_name", "press"),
+            ("title", "merger review 4242"),
+        ]
+
+        self.stdout.write(f"{'lookup':>40} {'seq scan (ms)':>14} {'trigram (ms)':>13} {'rows':>8}")
+        for field, value in lookups:
+            queryset = Article.objects.filter(**{f"{field}__icontains": value}).order_by()
+            seq_scan_time, rows = self.time(queryset, repeat, use_index=False)
+            index_time, _ = self.time(queryset, repeat, use_index=True)
+            self.stdout.write(
+                f"{f'{field}__icontains={value!r}':>40} {seq_scan_time * 1000:>14.1f} {index_time * 1000:>13.1f} "
+                f"{rows:>8}"
+            )
+
+    @staticmethod
+    def time(queryset, repeat, use_index):
+        # SET LOCAL would outlive a savepoint, so the planner settings are reset explicitly instead
+        scan_setting = "on" if use_index else "off"
+        timings = []
+        with connection.cursor() as cursor:
+            cursor.execute(f"SET enable_bitmapscan = {scan_setting}")
+            cursor.execute(f"SET enable_indexscan = {scan_setting}")
+            try:
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    rows = queryset.count()
+                    timings.append(time.perf_counter() - started)
+            finally:
+                cursor.execute("RESET enable_bitmapscan")
+                cursor.execute("RESET enable_indexscan")
+        return min(timings), rows
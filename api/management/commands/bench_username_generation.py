@@ -0,0 +1,76 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from api.services import AuthService
+from api.utils import chunked, count_queries, rolled_back
+
+SEED_BATCH_SIZE = 5000
+
+User = get_user_model()
+
+
+def generate_with_exists_loop(email):
+    """How AuthService picked a username before the single-query lookup, kept as the baseline."""
+    username = email.split("@")[0]
+    counter = 1
+    original_username = username
+    while User.objects.filter(username=username).exists():
+        username = f"{original_username}{counter}"
+        counter += 1
+    return username
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks registering an email whose local part is shared by N existing usernames (prefix, prefix1, "
+        "prefix2, ...) with the single-query username lookup against the exists() loop it replaced. Seeds users "
+        "inside a transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, nargs="+", default=[100, 1000, 10000])
+        parser.add_argument("--prefix", default="benchjohn")
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'users':>8} {'impl':>12} {'username (ms)':>14} {'register (ms)':>14} {'queries':>8}")
+
+        for user_count in options["users"]:
+            with rolled_back():
+                self.seed(options["prefix"], user_count)
+                self.run(options["prefix"], user_count, options["repeat"])
+
+    def seed(self, prefix, user_count):
+        users = (User(username=f"{prefix}{i or ''}", password="!") for i in range(user_count))
+        for batch in chunked(users, SEED_BATCH_SIZE):
+            User.objects.bulk_create(batch)
+
+    def run(self, prefix, user_count, repeat):
+        email = f"{prefix}@example.com"
+        implementations = (
+            ("exists-loop", generate_with_exists_loop),
+            ("single-query", AuthService._generate_unique_username_from_email),
+        )
+        for name, generate in implementations:
+            generate_timings = []
+            register_timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                username = generate(email)
+                generate_timings.append(time.perf_counter() - started)
+                assert username == f"{prefix}{user_count}"
+
+                # Each registration is rolled back, so every run sees the same N users
+                with mock.patch.object(AuthService, "_generate_unique_username_from_email", staticmethod(generate)):
+                    with rolled_back(), count_queries() as counter:
+                        started = time.perf_counter()
+                        AuthService.create_user_with_preferences(email, "benchmark-password")
+                        register_timings.append(time.perf_counter() - started)
+
+            self.stdout.write(
+                f"{user_count:>8} {name:>12} {min(generate_timings) * 1000:>14.1f} "
+                f"{min(register_timings) * 1000:>14.1f} {counter.count:>8}"
+            )
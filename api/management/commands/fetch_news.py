@@ -1,86 +1,161 @@
+import hashlib
+import queue
+import threading
+import time
 from collections import defaultdict
-from datetime import datetime, timedelta
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta, timezone as dt_timezone
 
-import requests
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from loguru import logger
 
-from api.models import UserPreference, Article, UserArticle, Source, Country
+from api.cache import bump_feed_versions
+from api.models import Article, UserArticle, FetchCursor
+from api.newsapi import RequestBudget, get_client
+from api.refdata import get_reference_data
+from api.routing import RoutingIndex, RoutingSnapshot
+from api.utils import advisory_lock, chunked, track_stage
 
-NEWSAPI_BASE_URL = "https://newsapi.org/v2/everything"
 MAX_QUERY_LENGTH = 500
 MAX_SOURCES = 20
+BULK_BATCH_SIZE = 1000
+INGEST_BATCH_SIZE = 500
+LINK_BATCH_SIZE = 10000
+PAGE_QUEUE_FACTOR = 2
+CURSOR_RETENTION = timedelta(days=7)
+LOG_FILE = "logs/fetch_news.log"
 
 User = get_user_model()
 
+_log_sink_id = None
+_log_sink_lock = threading.Lock()
+
+
+def add_log_sink():
+    """Adds the fetch_news log file once per process, however many Commands a process_tasks worker creates."""
+    global _log_sink_id
+    with _log_sink_lock:
+        if _log_sink_id is None:
+            _log_sink_id = logger.add(LOG_FILE, rotation="1 day", retention="30 days")
+
 
 class Command(BaseCommand):
     help = "Fetches news articles from NewsAPI /v2/everything endpoint with keyword batching"
 
     def __init__(self):
         super().__init__()
-        logger.add("logs/fetch_news.log", rotation="1 day", retention="30 days")
+        add_log_sink()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help="Maximum number of concurrent NewsAPI requests (defaults to NEWSAPI_FETCH_CONCURRENCY)",
+        )
+        parser.add_argument(
+            "--budget",
+            type=int,
+            default=None,
+            help="Maximum number of NewsAPI requests for this run (defaults to NEWSAPI_REQUEST_BUDGET)",
+        )
+        parser.add_argument(
+            "--country",
+            default=None,
+            help="Only run the queries of this country code, i.e. one shard of a fetch cycle",
+        )
 
     def handle(self, *args, **options):
-        logger.info("Starting news fetch command")
-
-        user_prefs = self.get_user_preferences()
-        if not user_prefs:
-            logger.warning("No user preferences found")
-            return
-
-        country_data = self.organize_by_country(user_prefs)
-
-        all_articles_dict = {}
-        for country_code, data in country_data.items():
-            articles = self.fetch_articles_for_country(country_code, data)
-            for article in articles:
-                url = article.get("url")
-                if url and url not in all_articles_dict:
-                    all_articles_dict[url] = article
+        self.run(
+            country_code=options.get("country"),
+            concurrency=options.get("concurrency"),
+            budget=options.get("budget"),
+        )
 
-        all_articles = list(all_articles_dict.values())
-        logger.info(f"Total unique articles: {len(all_articles)}")
+    def run(self, country_code=None, concurrency=None, budget=None):
+        """
+        Runs a fetch cycle, or only the shard of ``country_code``, and returns its summary. Each country is
+        locked while it is fetched, so shards running in other workers are skipped instead of fetched twice.
 
-        if all_articles:
-            self.process_and_link_articles(all_articles, user_prefs)
+        The summary's ``status`` is "empty" when there is nothing to fetch (no preferences, or no sources or
+        keywords for the country), "locked" when every country to fetch is held by another worker and "done"
+        otherwise; ``locked`` lists the countries that were skipped.
+        """
+        logger.info(f"Starting news fetch command{f' for country {country_code}' if country_code else ''}")
+        started = time.perf_counter()
 
+        snapshot = self.get_routing_snapshot()
+        if not snapshot.users:
+            logger.warning("No user preferences found")
+            return {"status": "empty"}
+
+        country_data = self.organize_by_country(snapshot)
+        if country_code:
+            country_data = {code: data for code, data in country_data.items() if code == country_code.lower()}
+        if not country_data:
+            logger.warning("No country with sources and keywords to fetch")
+            return {"status": "empty"}
+
+        concurrency = concurrency or settings.NEWSAPI_FETCH_CONCURRENCY
+        budget = RequestBudget(budget or settings.NEWSAPI_REQUEST_BUDGET or None)
+
+        locked = []
+        with ExitStack() as locks:
+            for code in list(country_data):
+                if not locks.enter_context(advisory_lock(f"fetch_news:{code}")):
+                    logger.warning(f"Skipping country {code} - already being fetched by another worker")
+                    del country_data[code]
+                    locked.append(code)
+            if not country_data:
+                return {"status": "locked", "locked": locked}
+
+            high_water_marks = {}
+            article_pages = self.iter_article_pages(country_data, concurrency, high_water_marks, budget)
+
+            summary = self.process_and_link_articles(article_pages, snapshot)
+            self.save_high_water_marks(high_water_marks)
+
+        summary["status"] = "done"
+        summary["countries"] = sorted(country_data)
+        summary["locked"] = locked
+        summary["requests"] = budget.used
+        summary["elapsed"] = time.perf_counter() - started
         logger.info(
-            f"News fetch completed. Total articles processed: {len(all_articles)}"
+            f"News fetch completed. Total articles processed: {summary['articles']}, "
+            f"NewsAPI requests used: {budget.used}"
         )
+        return summary
 
-    def get_user_preferences(self):
-        preferences = (
-            UserPreference.objects.select_related("user")
-            .prefetch_related("preferred_countries", "preferred_sources")
-            .all()
-        )
+    def get_routing_snapshot(self):
+        # Shared by query planning and article routing, so preferences are read once per run
+        snapshot = RoutingSnapshot.load()
 
-        logger.info(f"Found {preferences.count()} user preferences")
-        return list(preferences)
+        logger.info(f"Found {len(snapshot.users)} user preferences")
+        return snapshot
 
-    def organize_by_country(self, user_prefs):
+    def organize_by_country(self, snapshot):
         country_data = defaultdict(
             lambda: {"users": set(), "sources": set(), "all_keywords": []}
         )
 
-        for pref in user_prefs:
-            countries = list(pref.preferred_countries.all())
-            if not countries:
-                logger.warning(f"No countries found for user {pref.user.username}")
+        for user in snapshot.users:
+            if not user.countries:
+                logger.warning(f"No countries found for user {user.username}")
                 continue
 
-            for country in countries:
-                country_code = country.code.lower()
-                country_data[country_code]["users"].add(pref.user.id)
-                country_data[country_code]["all_keywords"].extend(pref.keywords)
-
-                for source in pref.preferred_sources.all():
-                    if source.country.id == country.id:
-                        country_data[country_code]["sources"].add(source.api_id)
+            for country_id, code in user.countries:
+                country_code = code.lower()
+                country_data[country_code]["users"].add(user.user_id)
+                country_data[country_code]["all_keywords"].extend(user.keywords)
+                country_data[country_code]["sources"].update(
+                    api_id for api_id, source_country_id in user.sources if source_country_id == country_id
+                )
 
         final_country_data = {}
         for country_code, data in country_data.items():
@@ -95,7 +170,7 @@ class Command(BaseCommand):
 
             final_country_data[country_code] = {
                 "users": list(data["users"]),
-                "sources": list(data["sources"])[:MAX_SOURCES],
+                "sources": sorted(data["sources"])[:MAX_SOURCES],
                 "keyword_batches": keyword_batches,
             }
 
@@ -116,7 +191,8 @@ class Command(BaseCommand):
         if not unique_keywords:
             return []
 
-        keywords_list = list(unique_keywords)
+        # Sorted so a set of keywords always produces the same batches, and therefore the same cursors
+        keywords_list = sorted(unique_keywords)
         logger.info(f"Processing {len(keywords_list)} unique keywords")
         batches = []
         current_batch = []
@@ -148,184 +224,376 @@ class Command(BaseCommand):
         logger.info(f"Created {len(batches)} keyword batches")
         return batches
 
-    def fetch_articles_for_country(self, country_code, country_data):
-        logger.info(f"Fetching articles for country: {country_code}")
+    def iter_article_pages(self, country_data, concurrency, high_water_marks, budget=None):
+        """
+        Fetch stage: runs every (country, keyword batch) query on a thread pool and yields pages of articles
+        not yet in the database as they arrive. ``high_water_marks`` is filled with the next cursor of each query,
+        ``(country_code, newest_published_at, resume_after, resume_before)``.
+
+        Every query moves its cursor to the newest article it saw. One cut short by the page limit, the request
+        budget, maximumResultsReached or an error also records the gap it left, from where it started to the
+        oldest article it reached; the next run fetches that gap before anything newer.
 
+        Pages are checked against the database here, on the consumer's thread, and a query stops paging once a
+        whole page is already stored.
+        """
         if not settings.NEWSAPI_KEY:
             logger.error("NEWSAPI_KEY not configured")
-            return []
-
-        sources = country_data["sources"]
-        keyword_batches = country_data["keyword_batches"]
-
-        to_time = datetime.now()
-        from_time = to_time - timedelta(hours=24)
-        to_time_str = to_time.strftime("%Y-%m-%d")
-        from_time_str = from_time.strftime("%Y-%m-%d")
-
-        country_articles = {}
-        sources_string = ",".join(sources)
-
-        for batch_idx, keywords in enumerate(keyword_batches):
-            raw_query = " OR ".join(f'"{keyword}"' for keyword in keywords)
-
-            params = {
-                "apiKey": settings.NEWSAPI_KEY,
-                "q": raw_query,
-                "searchIn": "title,content",
-                "to": to_time_str,
-                "from": from_time_str,
-                "pageSize": 100,
-                "sortBy": "publishedAt",
-                "sources": sources_string,
-            }
-
-            try:
-                response = requests.get(NEWSAPI_BASE_URL, params=params, timeout=30)
-                response.raise_for_status()
-
-                data = response.json()
-
-                if data.get("status") == "error":
-                    logger.error(f"NewsAPI error: {data.get('message')}")
-                    continue
-
-                articles = data.get("articles", [])
+            return
 
-                for article in articles:
-                    url = article.get("url")
-                    if url and url not in country_articles:
-                        country_articles[url] = article
+        to_time = timezone.now()
+        default_from_time = to_time - timedelta(hours=24)
 
-            except Exception as e:
-                logger.error(
-                    f"API request failed for {country_code}, batch {batch_idx}: {e}"
-                )
-                continue
-
-        logger.info(
-            f"Country {country_code}: collected {len(country_articles)} articles"
-        )
-        return list(country_articles.values())
+        queries = [
+            (country_code, batch_idx, self.get_query_key(country_code, data["sources"], keywords))
+            for country_code, data in country_data.items()
+            for batch_idx, keywords in enumerate(data["keyword_batches"])
+        ]
+        if not queries:
+            return
 
-    def process_and_link_articles(self, articles_data, user_prefs):
+        cursor_rows = FetchCursor.objects.filter(
+            query_key__in=[query_key for _, _, query_key in queries]
+        ).values_list("query_key", "newest_published_at", "resume_after", "resume_before")
+        cursors = {}
+        gaps = {}
+        for query_key, newest_published_at, resume_after, resume_before in cursor_rows:
+            cursors[query_key] = newest_published_at
+            if resume_before is not None:
+                gaps[query_key] = (resume_after, resume_before)
         logger.info(
-            f"Processing {len(articles_data)} articles for {len(user_prefs)} users"
+            f"Resuming {len(cursors)} of {len(queries)} queries from their high-water mark, "
+            f"{len(gaps)} of them filling the gap left by a run that stopped early"
         )
+        from_times = {}
+        to_times = {}
+        for _, _, query_key in queries:
+            from_times[query_key], to_times[query_key] = gaps.get(
+                query_key, (cursors.get(query_key, default_from_time), to_time)
+            )
 
-        users_by_source = defaultdict(set)
-        users_by_keyword = defaultdict(set)
-        users_with_no_sources = set()
-        users_with_no_keywords = set()
-
-        for pref in user_prefs:
-            user_id = pref.user.id
-            sources = {source.api_id for source in pref.preferred_sources.all()}
-            if sources:
-                for source_id in sources:
-                    users_by_source[source_id].add(user_id)
-            else:
-                users_with_no_sources.add(user_id)
-
-            keywords = [kw.lower().strip() for kw in pref.keywords or [] if kw and kw.strip()]
-            if keywords:
-                for keyword in keywords:
-                    users_by_keyword[keyword].add(user_id)
-            else:
-                users_with_no_keywords.add(user_id)
-
-        new_articles = 0
-        user_articles_to_create = []
-
-        for article_data in articles_data:
-            url = article_data.get("url")
-            title = article_data.get("title")
-            published_at_str = article_data.get("publishedAt")
-            source_info = article_data.get("source", {})
-            source_id = source_info.get("id")
-            source_name = source_info.get("name")
-            description = article_data.get("description")
-            image_url = article_data.get("urlToImage")
-
-            # Skip articles missing essential information
-            if not url or not title or not published_at_str:
-                continue
-
-            # Parse published date
-            try:
-                published_at = parse_datetime(published_at_str)
-                if not published_at:
+        concurrency = max(1, min(concurrency, len(queries)))
+        logger.info(f"Fetching {len(queries)} NewsAPI queries with concurrency {concurrency}")
+
+        # Bounded so fetch threads wait for ingestion instead of buffering the whole run in memory
+        pages = queue.Queue(maxsize=concurrency * PAGE_QUEUE_FACTOR)
+        stopped = threading.Event()
+        # Queries whose last page was already stored, set by the consumer before it releases the page's fetcher
+        reached_known = set()
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
                     continue
-            except (ValueError, TypeError):
-                continue
-
-            try:
-                source_obj = Source.objects.get(api_id=source_id)
-            except Source.DoesNotExist:
-                source_obj = None
-
-            article, created = Article.objects.get_or_create(
-                article_url=url,
-                defaults={
-                    "title": title,
-                    "summary": description,
-                    "source_name": source_name,
-                    "source": source_obj,
-                    "image_url": image_url,
-                    "published_at": published_at,
-                },
+            return False
+
+        def run_query(country_code, batch_idx, query_key):
+            if stopped.is_set():
+                return
+            data = country_data[country_code]
+            params = self.build_query_params(
+                data["sources"], data["keyword_batches"][batch_idx], from_times[query_key], to_times[query_key]
             )
+            complete = False
+            try:
+                query_pages = get_client().iter_everything(
+                    params,
+                    budget=budget,
+                    stop_before=from_times[query_key] if query_key in cursors else None,
+                    max_pages=settings.NEWSAPI_MAX_PAGES,
+                )
+                while not stopped.is_set():
+                    try:
+                        page = next(query_pages)
+                    except StopIteration as done:
+                        complete = done.value
+                        break
+                    checked = threading.Event()
+                    if not put((country_code, query_key, page, checked, False)):
+                        return
+                    # The next page is only requested once the consumer knows whether this one was new
+                    while not checked.wait(0.1):
+                        if stopped.is_set():
+                            return
+                    if query_key in reached_known:
+                        complete = True
+                        break
+            except Exception as e:
+                logger.error(f"API request failed for {country_code}, batch {batch_idx}: {e}")
+            finally:
+                put((country_code, query_key, None, None, complete))
 
-            if created:
-                new_articles += 1
+        country_counts = defaultdict(int)
+        # (newest, oldest) publication time of the articles each query returned, stored or not
+        fetched = {}
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="newsapi") as executor:
+            for query in queries:
+                executor.submit(run_query, *query)
 
-            matching_users = self.find_matching_users_optimized(
-                article,
-                source_id,
-                users_by_source,
-                users_by_keyword,
-                users_with_no_sources,
-                users_with_no_keywords,
+            try:
+                remaining = len(queries)
+                while remaining:
+                    country_code, query_key, page, checked, complete = pages.get()
+                    if page is None:
+                        remaining -= 1
+                        cursor = self.next_cursor(
+                            from_times[query_key], cursors.get(query_key), gaps.get(query_key),
+                            fetched.get(query_key), complete,
+                        )
+                        if cursor:
+                            high_water_marks[query_key] = (country_code, *cursor)
+                        continue
+
+                    stored_urls = self.get_stored_articles([article.get("url") for article in page])
+                    new_articles = [article for article in page if article.get("url") not in stored_urls]
+                    if not new_articles:
+                        reached_known.add(query_key)
+                    checked.set()
+
+                    for article in page:
+                        published_at = parse_datetime(article.get("publishedAt") or "")
+                        if published_at:
+                            newest, oldest = fetched.get(query_key, (published_at, published_at))
+                            fetched[query_key] = (max(newest, published_at), min(oldest, published_at))
+
+                    if new_articles:
+                        country_counts[country_code] += len(new_articles)
+                        yield new_articles
+            finally:
+                stopped.set()
+                # Queries that have not started yet would otherwise still spend the budget on pages nobody reads
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        for country_code in country_data:
+            logger.info(f"Country {country_code}: received {country_counts[country_code]} articles")
+
+    def next_cursor(self, from_time, newest_published_at, gap, fetched, complete):
+        """
+        Returns the ``(newest_published_at, resume_after, resume_before)`` a query's cursor should move to, or None
+        to leave it as it is. ``gap`` is the ``(resume_after, resume_before)`` the query was filling, if any, and
+        ``fetched`` the (newest, oldest) publication time of the articles it returned.
+        """
+        newest = newest_published_at
+        if fetched and (newest is None or fetched[0] > newest):
+            newest = fetched[0]
+        if complete:
+            if gap is None and newest == newest_published_at:
+                return None
+            return newest, None, None
+        if fetched:
+            # Only the articles from the oldest one reached upwards are in, so what lies below it down to where
+            # the query started is left for the next run
+            return newest, gap[0] if gap else from_time, fetched[1]
+        return None
+
+    def get_query_key(self, country_code, sources, keywords):
+        query = "|".join([country_code, ",".join(sorted(sources)), ",".join(sorted(keywords))])
+        return hashlib.sha256(query.encode()).hexdigest()
+
+    def build_query_params(self, sources, keywords, from_time, to_time):
+        return {
+            "q": " OR ".join(f'"{keyword}"' for keyword in keywords),
+            "searchIn": "title,content",
+            "to": self.format_newsapi_time(to_time),
+            "from": self.format_newsapi_time(from_time),
+            "sources": ",".join(sources),
+        }
+
+    def format_newsapi_time(self, value):
+        return value.astimezone(dt_timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+    def save_high_water_marks(self, high_water_marks):
+        if high_water_marks:
+            FetchCursor.objects.bulk_create(
+                [
+                    FetchCursor(
+                        query_key=query_key,
+                        country_code=country_code,
+                        newest_published_at=newest,
+                        resume_after=resume_after,
+                        resume_before=resume_before,
+                    )
+                    for query_key, (country_code, newest, resume_after, resume_before) in high_water_marks.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["query_key"],
+                update_fields=["newest_published_at", "resume_after", "resume_before", "updated_at"],
             )
-            user_articles_to_create += [
-                UserArticle(user_id=user_id, article=article) for user_id in matching_users
-            ]
 
-        if user_articles_to_create:
-            UserArticle.objects.bulk_create(
-                user_articles_to_create, ignore_conflicts=True
+        # Keyword batches change whenever users edit their keywords, so cursors of old batches are dropped
+        FetchCursor.objects.filter(updated_at__lt=timezone.now() - CURSOR_RETENTION).delete()
+
+    def process_and_link_articles(self, article_pages, snapshot, batch_size=INGEST_BATCH_SIZE):
+        """
+        Runs the parse -> dedupe -> persist -> link stages over a stream of article pages. Articles are persisted
+        and linked in fixed-size batches, each in its own transaction, so memory stays bounded by the batch size
+        and users see the first articles before the whole run is done.
+        """
+        logger.info(f"Processing articles for {len(snapshot.users)} users")
+
+        routing = RoutingIndex(snapshot.routing_users())
+
+        stats = {}
+        summary = {"articles": 0, "new_articles": 0, "new_links": 0, "stages": stats}
+        articles = self.iter_unique_articles(self.iter_parsed_articles(article_pages, stats))
+
+        for batch in chunked(articles, batch_size):
+            with transaction.atomic():
+                with track_stage(stats, "sources"):
+                    source_ids = self.resolve_source_ids()
+                with track_stage(stats, "articles"):
+                    stored_articles, created = self.save_articles(batch, source_ids)
+                with track_stage(stats, "links"):
+                    new_links, linked_user_ids = self.link_articles(batch, stored_articles, routing)
+            # Only after the commit, so a feed read between the bump and the commit cannot cache stale links
+            bump_feed_versions(linked_user_ids)
+
+            summary["articles"] += len(batch)
+            summary["new_articles"] += created
+            summary["new_links"] += new_links
+            logger.info(f"Ingested batch of {len(batch)} articles: {created} new, {new_links} new links")
+
+        for stage, stage_stats in stats.items():
+            logger.info(
+                f"Stage {stage}: {stage_stats['queries']} queries in {stage_stats['elapsed']:.3f}s"
             )
-        new_links = len(user_articles_to_create)
-
         logger.info(
-            f"Processing complete: {new_articles} new articles, {new_links} new links"
+            f"Processing complete: {summary['new_articles']} new articles, {summary['new_links']} new links"
         )
+        return summary
+
+    def iter_parsed_articles(self, article_pages, stats):
+        for articles_data in article_pages:
+            with track_stage(stats, "parse"):
+                parsed_articles = [self.parse_article(article_data) for article_data in articles_data]
+            yield from (article for article in parsed_articles if article is not None)
+
+    def parse_article(self, article_data):
+        url = article_data.get("url")
+        title = article_data.get("title")
+        published_at_str = article_data.get("publishedAt")
+        source_info = article_data.get("source") or {}
+
+        # Skip articles missing essential information
+        if not url or not title or not published_at_str:
+            return None
+
+        # Parse published date
+        try:
+            published_at = parse_datetime(published_at_str)
+            if not published_at:
+                return None
+        except (ValueError, TypeError):
+            return None
+
+        return {
+            "url": url,
+            "title": title,
+            "summary": article_data.get("description"),
+            "source_api_id": source_info.get("id"),
+            "source_name": source_info.get("name"),
+            "image_url": article_data.get("urlToImage"),
+            "published_at": published_at,
+        }
+
+    def iter_unique_articles(self, articles):
+        seen_urls = set()
+        for article in articles:
+            if article["url"] not in seen_urls:
+                seen_urls.add(article["url"])
+                yield article
+
+    def link_articles(self, articles, stored_articles, routing):
+        new_links = 0
+        linked_user_ids = set()
+        # (user_id, article_id) -> published_at of every link the routing asks for
+        candidates = {}
+
+        for article in articles:
+            article_text = f"{(article['title'] or '').lower()} {(article['summary'] or '').lower()}"
+            # The stored publication time wins over the payload's for articles saved by an earlier run
+            article_id, published_at = stored_articles[article["url"]]
+            for user_id in routing.match(article["source_api_id"], article_text):
+                candidates[(user_id, article_id)] = published_at
+
+            if len(candidates) >= LINK_BATCH_SIZE:
+                inserted = self.insert_links(candidates)
+                new_links += len(inserted)
+                linked_user_ids.update(user_id for user_id, _ in inserted)
+                candidates = {}
+
+        if candidates:
+            inserted = self.insert_links(candidates)
+            new_links += len(inserted)
+            linked_user_ids.update(user_id for user_id, _ in inserted)
+
+        return new_links, linked_user_ids
+
+    def insert_links(self, candidates):
+        """
+        Inserts the candidate links that do not exist yet and returns their (user_id, article_id) pairs.
+        bulk_create with ignore_conflicts does not report which rows it skipped, so existing links are read
+        first; only users who really get a new link have their cached feed invalidated.
+        """
+        article_ids = list({article_id for _, article_id in candidates})
+        existing = set()
+        for i in range(0, len(article_ids), BULK_BATCH_SIZE):
+            existing.update(
+                UserArticle.objects.filter(article_id__in=article_ids[i:i + BULK_BATCH_SIZE]).values_list(
+                    "user_id", "article_id"
+                )
+            )
 
-    def find_matching_users_optimized(
-            self,
-            article,
-            source_id,
-            users_by_source,
-            users_by_keyword,
-            users_with_no_sources,
-            users_with_no_keywords,
-    ):
-        source_matching_users = set()
-        if source_id and source_id in users_by_source:
-            source_matching_users.update(users_by_source[source_id])
-        source_matching_users.update(users_with_no_sources)
-
-        keyword_matching_users = set()
-        article_text = ""
-        if article.title:
-            article_text += article.title.lower() + " "
-        if article.summary:
-            article_text += article.summary.lower()
-
-        for keyword, user_set in users_by_keyword.items():
-            if keyword in article_text:
-                keyword_matching_users.update(user_set)
-
-        keyword_matching_users.update(users_with_no_keywords)
-
-        return source_matching_users & keyword_matching_users
+        inserted = [pair for pair in candidates if pair not in existing]
+        # ignore_conflicts still covers a concurrent shard linking the same article
+        UserArticle.objects.bulk_create(
+            [
+                UserArticle(user_id=user_id, article_id=article_id, published_at=candidates[(user_id, article_id)])
+                for user_id, article_id in inserted
+            ],
+            batch_size=BULK_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        return inserted
+
+    def resolve_source_ids(self):
+        # Sources change only when populate_sources runs, so the cached reference data replaces a query per batch
+        return get_reference_data().source_ids_by_api_id
+
+    def save_articles(self, parsed_articles, source_ids):
+        stored_articles = self.get_stored_articles([article["url"] for article in parsed_articles])
+
+        new_articles = [
+            Article(
+                article_url=article["url"],
+                title=article["title"],
+                summary=article["summary"],
+                source_name=article["source_name"],
+                source_id=source_ids.get(article["source_api_id"]),
+                image_url=article["image_url"],
+                published_at=article["published_at"],
+            )
+            for article in parsed_articles
+            if article["url"] not in stored_articles
+        ]
+        if new_articles:
+            # ignore_conflicts does not return primary keys, so they are read back in one pass
+            Article.objects.bulk_create(new_articles, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+            stored_articles.update(self.get_stored_articles([article.article_url for article in new_articles]))
+
+        return stored_articles, len(new_articles)
+
+    def get_stored_articles(self, urls):
+        """Maps each stored article URL to its (id, published_at)."""
+        stored_articles = {}
+        for i in range(0, len(urls), BULK_BATCH_SIZE):
+            stored_articles.update(
+                (url, (article_id, published_at))
+                for url, article_id, published_at in Article.objects.filter(
+                    article_url__in=urls[i:i + BULK_BATCH_SIZE]
+                ).values_list("article_url", "id", "published_at")
+            )
+        return stored_articles
@@ -0,0 +1,214 @@
+import math
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api.cache import bump_feed_versions
+from api.models import Article, UserArticle
+
+PAGE_SIZE = 20
+REQUEST_TIMEOUT = 30
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests the personalized feed under gunicorn (conf/gunicorn.py) at increasing worker counts and reports "
+        "requests/sec and p50/p99 latency. Creates a load-test user linked to the newest articles and deletes it, "
+        "with its token and links, when done."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+        parser.add_argument("--threads", type=int, default=4, help="Threads per gunicorn worker")
+        parser.add_argument("--concurrency", type=int, default=32, help="Concurrent client connections")
+        parser.add_argument("--duration", type=float, default=10, help="Seconds measured per worker count")
+        parser.add_argument("--pages", type=int, default=5, help="Feed pages the clients cycle through")
+        parser.add_argument("--username", default="loadtest", help="Must not exist yet; deleted afterwards")
+        parser.add_argument("--articles", type=int, default=500, help="Newest articles linked to the user")
+        parser.add_argument(
+            "--no-feed-cache",
+            action="store_true",
+            help="Run the servers with FEED_CACHE_TIMEOUT=0, so every request runs the feed query",
+        )
+
+    def handle(self, *args, **options):
+        token, linked = self.prepare_user(options["username"], options["articles"])
+        try:
+            self.run_all(options, token, linked)
+        finally:
+            self.remove_user(options["username"])
+
+    def run_all(self, options, token, linked):
+        # Pages past the end of the feed would only measure 404s
+        pages = max(1, min(options["pages"], math.ceil(linked / PAGE_SIZE)))
+        env = {"FEED_CACHE_TIMEOUT": "0"} if options["no_feed_cache"] else {}
+
+        self.stdout.write(
+            f"{'workers':>8} {'threads':>8} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9}"
+        )
+        for workers in options["workers"]:
+            port = self.free_port()
+            server = self.start_server(port, workers, options["threads"], env=env)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                self.wait_until_ready(base_url, server)
+                result = self.run(base_url, token, options["concurrency"], options["duration"], pages)
+            finally:
+                self.stop_server(server)
+
+            self.stdout.write(
+                f"{workers:>8} {options['threads']:>8} {result['requests']:>9} {result['errors']:>7} "
+                f"{result['rps']:>8.1f} {result['p50'] * 1000:>9.1f} {result['p99'] * 1000:>9.1f}"
+            )
+
+    def prepare_user(self, username, article_count):
+        # An existing user is never reused, since remove_user deletes the load-test user afterwards
+        if User.objects.filter(username=username).exists():
+            raise CommandError(f"User {username!r} already exists; pass another --username")
+        user = User.objects.create_user(username=username)
+        article_ids = Article.objects.order_by("-published_at").values_list("id", "published_at")[:article_count]
+        UserArticle.objects.bulk_create(
+            [
+                UserArticle(user=user, article_id=article_id, published_at=published_at)
+                for article_id, published_at in article_ids
+            ],
+            ignore_conflicts=True,
+        )
+        bump_feed_versions([user.id])
+        return user.auth_token.key, UserArticle.objects.filter(user=user).count()
+
+    def remove_user(self, username):
+        # Cascades to the token, the feed links and the preferences, so no valid credential is left behind
+        User.objects.filter(username=username).delete()
+        self.stdout.write(f"Deleted load-test user {username!r}")
+
+    @staticmethod
+    def free_port():
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    def start_server(self, port, workers, threads, env=None):
+        env = {
+            **os.environ,
+            "ALLOWED_HOSTS": ",".join(filter(None, [*settings.ALLOWED_HOSTS, "127.0.0.1"])),
+            "WEB_ACCESS_LOG": "",
+            **(env or {}),
+        }
+        return subprocess.Popen(
+            [
+                sys.executable, "-m", "gunicorn",
+                "--config", str(settings.BASE_DIR / "gunicorn.py"),
+                "--bind", f"127.0.0.1:{port}",
+                "--workers", str(workers),
+                "--threads", str(threads),
+            ],
+            cwd=settings.BASE_DIR.parent,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    @staticmethod
+    def stop_server(server):
+        # SIGTERM is gunicorn's graceful shutdown
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    @staticmethod
+    def wait_until_ready(base_url, server, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"gunicorn exited with status {server.returncode}")
+            try:
+                requests.get(base_url, timeout=5)
+                return
+            except requests.RequestException:
+                time.sleep(0.2)
+        raise CommandError(f"gunicorn did not start within {timeout}s")
+
+    def run(self, base_url, token, concurrency, duration, pages):
+        url = f"{base_url}/api/articles/personalized-feed/"
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        clock = {}
+
+        def start_clock():
+            clock["started"] = time.perf_counter()
+            clock["deadline"] = clock["started"] + duration
+
+        # Clients warm the workers up first, so imports and first connections are not measured. A client whose
+        # warm-up fails breaks the barrier, and the timeout bounds a warm-up that never finishes.
+        start = threading.Barrier(concurrency + 1, action=start_clock, timeout=(pages + 1) * REQUEST_TIMEOUT)
+
+        def client(index):
+            session = requests.Session()
+            session.headers["Authorization"] = f"Token {token}"
+            try:
+                for page in range(1, pages + 1):
+                    session.get(url, params={"page": page, "page_size": PAGE_SIZE}, timeout=REQUEST_TIMEOUT)
+            except BaseException:
+                start.abort()
+                raise
+            start.wait()
+
+            own_latencies = []
+            own_errors = 0
+            request_number = index
+            while time.perf_counter() < clock["deadline"]:
+                started = time.perf_counter()
+                try:
+                    params = {"page": request_number % pages + 1, "page_size": PAGE_SIZE}
+                    ok = session.get(url, params=params, timeout=REQUEST_TIMEOUT).status_code == 200
+                except requests.RequestException:
+                    ok = False
+                own_latencies.append(time.perf_counter() - started)
+                own_errors += not ok
+                request_number += concurrency
+            with lock:
+                latencies.extend(own_latencies)
+                errors.append(own_errors)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(client, index) for index in range(concurrency)]
+            try:
+                start.wait()
+            except threading.BrokenBarrierError:
+                failures = [future.exception() for future in futures]
+                cause = next((e for e in failures if not isinstance(e, threading.BrokenBarrierError)), None)
+                raise CommandError(f"Warming up the feed failed: {cause or 'timed out'}") from cause
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - clock["started"]
+
+        latencies.sort()
+        return {
+            "requests": len(latencies),
+            "errors": sum(errors),
+            "rps": len(latencies) / elapsed,
+            "p50": self.percentile(latencies, 0.50),
+            "p99": self.percentile(latencies, 0.99),
+        }
+
+    @staticmethod
+    def percentile(sorted_values, fraction):
+        if not sorted_values:
+            return 0.0
+        return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
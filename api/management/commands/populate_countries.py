@@ -2,6 +2,7 @@ from loguru import logger
 from django.core.management.base import BaseCommand
 from django.db import IntegrityError
 from api.models import Country
+from api.refdata import defer_reference_data_bump
 
 
 class Command(BaseCommand):
@@ -70,31 +71,32 @@ class Command(BaseCommand):
         countries_added = 0
         countries_skipped = 0
 
-        for code, name in self.COUNTRY_MAPPING.items():
-            try:
-                country_obj, created = Country.objects.get_or_create(
-                    code=code.lower(), defaults={"name": name}
-                )
+        with defer_reference_data_bump():
+            for code, name in self.COUNTRY_MAPPING.items():
+                try:
+                    country_obj, created = Country.objects.get_or_create(
+                        code=code.lower(), defaults={"name": name}
+                    )
 
-                if created:
-                    countries_added += 1
-                else:
-                    if country_obj.name != name:
-                        old_name = country_obj.name
-                        country_obj.name = name
-                        country_obj.save()
+                    if created:
+                        countries_added += 1
                     else:
-                        logger.warning(
-                            f"Skipped (already exists): {country_obj.name} ({code.upper()})"
-                        )
-                    countries_skipped += 1
+                        if country_obj.name != name:
+                            old_name = country_obj.name
+                            country_obj.name = name
+                            country_obj.save()
+                        else:
+                            logger.warning(
+                                f"Skipped (already exists): {country_obj.name} ({code.upper()})"
+                            )
+                        countries_skipped += 1
 
-            except IntegrityError as e:
-                logger.error(f"IntegrityError for code {code.upper()}: {e}.")
-            except Exception as e:
-                logger.error(
-                    f"An unexpected error occurred for code {code.upper()} ({name}): {e}"
-                )
+                except IntegrityError as e:
+                    logger.error(f"IntegrityError for code {code.upper()}: {e}.")
+                except Exception as e:
+                    logger.error(
+                        f"An unexpected error occurred for code {code.upper()} ({name}): {e}"
+                    )
 
         logger.success(
             f"Finished populating countries. Added: {countries_added}, Skipped/Existing/Updated: {countries_skipped}"
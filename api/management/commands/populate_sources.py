@@ -4,8 +4,8 @@ from django.core.management.base import BaseCommand
 from django.conf import settings
 from django.db import IntegrityError
 from api.models import Country, Source
-
-NEWSAPI_SOURCES_ENDPOINT = "https://newsapi.org/v2/sources"
+from api.newsapi import get_client
+from api.refdata import defer_reference_data_bump
 
 
 class Command(BaseCommand):
@@ -27,62 +27,62 @@ class Command(BaseCommand):
 
         total_sources_added = 0
         total_sources_processed_existing = 0
+        client = get_client()
 
-        for db_country in countries:
-            params = {"country": db_country.code, "apiKey": settings.NEWSAPI_KEY}
-
-            try:
-                response = requests.get(
-                    NEWSAPI_SOURCES_ENDPOINT, params=params, timeout=20
-                )
-                logger.info(f"Called URL for {db_country.code}: {response.url}")
-                response.raise_for_status()
+        with defer_reference_data_bump():
+            for db_country in countries:
+                params = {"country": db_country.code}
 
-                api_response_data = response.json()
-                api_sources = api_response_data.get("sources", [])
+                try:
+                    response = client.sources(params, timeout=20)
+                    logger.info(f"Called URL for {db_country.code}: {response.url}")
+                    response.raise_for_status()
 
-                if not api_sources:
-                    continue
+                    api_response_data = response.json()
+                    api_sources = api_response_data.get("sources", [])
 
-                for source_data in api_sources:
-                    api_id = source_data.get("id")
-                    if not api_id:
+                    if not api_sources:
                         continue
 
-                    defaults = {
-                        "name": source_data.get("name", ""),
-                        "description": source_data.get("description"),
-                        "url": source_data.get("url"),
-                        "category": source_data.get("category"),
-                        "language": source_data.get("language"),
-                        "country_code": source_data.get("country"),
-                        "country": db_country,
-                    }
-
-                    try:
-                        source_obj, created = Source.objects.update_or_create(
-                            api_id=api_id, defaults=defaults
-                        )
-                        if created:
-                            total_sources_added += 1
-                        else:
-                            total_sources_processed_existing += 1
-
-                    except IntegrityError as e:
-                        logger.error(f"IntegrityError for source api_id {api_id}: {e}")
-                    except Exception as e:
-                        logger.error(
-                            f"Could not save or update source {api_id} ('{source_data.get('name', '')}'): {e}"
-                        )
-
-            except requests.exceptions.RequestException as e:
-                logger.error(f"API request failed for country {db_country.code}: {e}")
-                if "response" in locals() and response is not None:
-                    logger.error(f"Failed URL: {response.url}")
-            except Exception as e:
-                logger.error(
-                    f"An unexpected error occurred while fetching sources for {db_country.code}: {e}"
-                )
+                    for source_data in api_sources:
+                        api_id = source_data.get("id")
+                        if not api_id:
+                            continue
+
+                        defaults = {
+                            "name": source_data.get("name", ""),
+                            "description": source_data.get("description"),
+                            "url": source_data.get("url"),
+                            "category": source_data.get("category"),
+                            "language": source_data.get("language"),
+                            "country_code": source_data.get("country"),
+                            "country": db_country,
+                        }
+
+                        try:
+                            source_obj, created = Source.objects.update_or_create(
+                                api_id=api_id, defaults=defaults
+                            )
+                            if created:
+                                total_sources_added += 1
+                            else:
+                                total_sources_processed_existing += 1
+
+                        except IntegrityError as e:
+                            logger.error(f"IntegrityError for source api_id {api_id}: {e}")
+                        except Exception as e:
+                            logger.error(
+                                f"Could not save or update source {api_id} ('{source_data.get('name', '')}'): {e}"
+                            )
+
+                except requests.exceptions.RequestException as e:
+                    logger.error(f"API request failed for country {db_country.code}: {e}")
+                    if "response" in locals() and response is not None:
+                        logger.error(f"Failed URL: {response.url}")
+                except Exception as e:
+                    logger.error(
+                        f"An unexpected error occurred while fetching sources for {db_country.code}: {e}"
+                    )
 
         logger.success(
             f"Finished populating sources. Added: {total_sources_added}, Processed existing (updated or unchanged): "
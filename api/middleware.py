@@ -0,0 +1,37 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from loguru import logger
+
+from .utils import count_queries
+
+
+class QueryCountMiddleware:
+    """
+    Counts the database queries of every request and logs a warning when a request runs more than
+    QUERY_COUNT_WARNING of them, which is usually an N+1 on a list endpoint. With DEBUG on, the count is also
+    returned in the X-Query-Count header.
+
+    Requests served asynchronously pass through uncounted: the async ORM runs their queries in worker threads,
+    out of reach of this thread's execute wrapper.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.get_response(request)
+
+        with count_queries() as counter:
+            response = self.get_response(request)
+
+        limit = settings.QUERY_COUNT_WARNING
+        if limit and counter.count > limit:
+            logger.warning(f"{request.method} {request.path} ran {counter.count} queries (limit {limit})")
+        if settings.DEBUG:
+            response["X-Query-Count"] = str(counter.count)
+        return response
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_alter_article_image_url"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FetchCursor",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "query_key",
+                    models.CharField(
+                        help_text="SHA-256 of the country, sources and keyword batch of a NewsAPI query.",
+                        max_length=64,
+                        unique=True,
+                    ),
+                ),
+                ("country_code", models.CharField(max_length=2)),
+                (
+                    "newest_published_at",
+                    models.DateTimeField(
+                        help_text="Publication time of the newest article already fetched by this query."
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
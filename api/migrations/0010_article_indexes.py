@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_fetchcursor"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(fields=["published_at"], name="api_article_published_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(fields=["fetched_at"], name="api_article_fetched_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(fields=["source", "published_at"], name="api_article_src_pub_idx"),
+        ),
+    ]
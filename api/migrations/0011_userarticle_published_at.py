@@ -0,0 +1,51 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:02
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_published_at(apps, schema_editor):
+    Article = apps.get_model("api", "Article")
+    UserArticle = apps.get_model("api", "UserArticle")
+    UserArticle.objects.filter(published_at__isnull=True).update(
+        published_at=Subquery(
+            Article.objects.filter(pk=OuterRef("article_id")).values("published_at")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_article_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="userarticle",
+            options={"ordering": ["-published_at"]},
+        ),
+        migrations.AddField(
+            model_name="userarticle",
+            name="published_at",
+            field=models.DateTimeField(
+                help_text="Copy of the article's publication time, so a user's feed is read from one index.",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(backfill_published_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="userarticle",
+            name="published_at",
+            field=models.DateTimeField(
+                help_text="Copy of the article's publication time, so a user's feed is read from one index.",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userarticle",
+            index=models.Index(
+                fields=["user", "-published_at", "-article"],
+                name="api_userarticle_feed_idx",
+            ),
+        ),
+    ]
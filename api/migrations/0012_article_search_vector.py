@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# A stored generated column is recomputed by PostgreSQL on every insert and update, including bulk_create in
+# fetch_news, so it never goes stale. Other databases keep using the icontains fallback in api.filters.
+# Adding a STORED column rewrites api_article under an ACCESS EXCLUSIVE lock, so reads and writes of the table
+# wait for the rewrite; run this in a quiet window on large tables. The GIN index is built separately, without
+# blocking writes, by 0014_article_search_index.
+CREATE_SEARCH_VECTOR = """
+ALTER TABLE api_article ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(summary, '')), 'B')
+) STORED;
+"""
+
+DROP_SEARCH_VECTOR = """
+DROP INDEX IF EXISTS api_article_search_idx;
+ALTER TABLE api_article DROP COLUMN IF EXISTS search_vector;
+"""
+
+
+def create_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SEARCH_VECTOR)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SEARCH_VECTOR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_userarticle_published_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+# Split from 0012 so the GIN index is built with CONCURRENTLY and the article table stays writable meanwhile,
+# which is why this migration is not atomic. IF NOT EXISTS covers databases that built it in 0012 already.
+SEARCH_INDEX = "api_article_search_idx"
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {SEARCH_INDEX} ON api_article USING GIN (search_vector)"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {SEARCH_INDEX}")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("api", "0013_article_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
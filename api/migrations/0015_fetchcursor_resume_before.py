@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0014_article_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fetchcursor",
+            name="resume_before",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Set when the last fetch stopped early: articles published between newest_published_at and "
+                "this time are still to be fetched.",
+                null=True,
+            ),
+        ),
+    ]
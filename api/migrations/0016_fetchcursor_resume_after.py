@@ -0,0 +1,40 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:48
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_resume_after(apps, schema_editor):
+    # Until now a gap always started at the cursor, which a run that stopped early left where it was
+    FetchCursor = apps.get_model("api", "FetchCursor")
+    FetchCursor.objects.filter(resume_before__isnull=False).update(resume_after=F("newest_published_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0015_fetchcursor_resume_before"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fetchcursor",
+            name="resume_after",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Set when a fetch stopped early: start of the gap of articles that are still to be fetched.",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="fetchcursor",
+            name="resume_before",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Set when a fetch stopped early: articles published between resume_after and this time are "
+                "still to be fetched.",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(set_resume_after, migrations.RunPython.noop),
+    ]
@@ -123,6 +123,11 @@ class Article(models.Model):
 
     class Meta:
         ordering = ["-published_at"]
+        indexes = [
+            models.Index(fields=["published_at"], name="api_article_published_idx"),
+            models.Index(fields=["fetched_at"], name="api_article_fetched_idx"),
+            models.Index(fields=["source", "published_at"], name="api_article_src_pub_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -136,10 +141,48 @@ class UserArticle(models.Model):
         Article, on_delete=models.CASCADE, related_name="users_in_feed"
     )
     saved_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(
+        help_text="Copy of the article's publication time, so a user's feed is read from one index.",
+    )
 
     class Meta:
         unique_together = ("user", "article")
-        ordering = ["-article__published_at"]
+        ordering = ["-published_at"]
+        indexes = [
+            models.Index(fields=["user", "-published_at", "-article"], name="api_userarticle_feed_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.published_at is None:
+            self.published_at = self.article.published_at
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.username} - {self.article.title}"
+
+
+class FetchCursor(models.Model):
+    query_key = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text="SHA-256 of the country, sources and keyword batch of a NewsAPI query.",
+    )
+    country_code = models.CharField(max_length=2)
+    newest_published_at = models.DateTimeField(
+        help_text="Publication time of the newest article already fetched by this query."
+    )
+    resume_after = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Set when a fetch stopped early: start of the gap of articles that are still to be fetched.",
+    )
+    resume_before = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Set when a fetch stopped early: articles published between resume_after and this time are still "
+        "to be fetched.",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.country_code}: {self.newest_published_at}"
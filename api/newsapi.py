@@ -0,0 +1,133 @@
+import threading
+
+import requests
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+MAX_PAGE_SIZE = 100
+
+
+class NewsAPIError(Exception):
+    def __init__(self, code, message):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+
+
+class RequestBudget:
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.limit is not None and self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+    @property
+    def exhausted(self):
+        return self.limit is not None and self.used >= self.limit
+
+
+class NewsAPIClient:
+    def __init__(self, base_url=None, api_key=None, pool_size=None, max_retries=None, backoff_factor=None,
+                 timeout=None):
+        self.base_url = (base_url or settings.NEWSAPI_BASE_URL).rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout or settings.NEWSAPI_TIMEOUT
+
+        pool_size = pool_size or settings.NEWSAPI_POOL_SIZE
+        retry = Retry(
+            total=settings.NEWSAPI_MAX_RETRIES if max_retries is None else max_retries,
+            backoff_factor=settings.NEWSAPI_BACKOFF_FACTOR if backoff_factor is None else backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, endpoint, params=None, timeout=None):
+        params = {"apiKey": self.api_key or settings.NEWSAPI_KEY, **(params or {})}
+        return self.session.get(f"{self.base_url}/{endpoint}", params=params, timeout=timeout or self.timeout)
+
+    def everything(self, params, timeout=None):
+        return self.get("everything", params=params, timeout=timeout)
+
+    def iter_everything(self, params, budget=None, stop_before=None, max_pages=None):
+        """
+        Lazily walks the pages of a /everything query sorted by publishedAt, yielding each page's articles.
+        Paging stops after the last page, when a page reaches articles older than ``stop_before``, after
+        ``max_pages`` pages or when ``budget`` runs out.
+
+        The generator returns True when paging completed (one of the first two) and False when it was cut short
+        by ``max_pages``, ``budget`` or maximumResultsReached, leaving older articles unfetched.
+        """
+        page = 1
+        while max_pages is None or page <= max_pages:
+            if budget is not None and not budget.acquire():
+                logger.warning(f"NewsAPI request budget exhausted, stopping at page {page} of query {params['q']!r}")
+                return False
+
+            response = self.everything({**params, "pageSize": MAX_PAGE_SIZE, "page": page, "sortBy": "publishedAt"})
+            try:
+                data = response.json()
+            except ValueError:
+                response.raise_for_status()
+                raise
+            if data.get("status") == "error":
+                if data.get("code") == "maximumResultsReached":
+                    return False
+                raise NewsAPIError(data.get("code"), data.get("message"))
+            response.raise_for_status()
+
+            articles = data.get("articles", [])
+            reached_known = False
+            if stop_before is not None:
+                for i, article in enumerate(articles):
+                    published_at = parse_datetime(article.get("publishedAt") or "")
+                    if published_at and published_at < stop_before:
+                        articles = articles[:i]
+                        reached_known = True
+                        break
+
+            if articles:
+                yield articles
+            if reached_known or page * MAX_PAGE_SIZE >= data.get("totalResults", 0):
+                return True
+            page += 1
+        return False
+
+    def sources(self, params, timeout=None):
+        return self.get("sources", params=params, timeout=timeout)
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_config = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client, _client_config
+
+    config = (settings.NEWSAPI_BASE_URL, settings.NEWSAPI_POOL_SIZE)
+    with _client_lock:
+        if _client is None or _client_config != config:
+            if _client is not None:
+                _client.close()
+            _client = NewsAPIClient()
+            _client_config = config
+        return _client
@@ -0,0 +1,166 @@
+import base64
+import binascii
+import json
+from collections.abc import Mapping
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a total ordering such as (-published_at, -id). A page is read with a range
+    condition on the ordering columns instead of an OFFSET, and no COUNT(*) is run, so every page costs the
+    same however deep the client scrolls. Cursors are opaque base64 tokens holding the boundary row's
+    ordering values and the direction.
+
+    The view may define ``get_cursor_ordering()`` to page over a different ordering; its last field must be
+    unique.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering = ("-published_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_rows(list(self.get_page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self.paginate_rows([row async for row in self.get_page_queryset(queryset, request, view)])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """The page plus one row, which tells whether another page follows."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(view)
+        self.position, self.reverse = self.decode_cursor(request)
+
+        ordering = [self.flip(field) for field in self.ordering] if self.reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            try:
+                queryset = self.filter_after(queryset, ordering, self.position)
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+        return queryset[:self.page_size + 1]
+
+    def paginate_rows(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        position = self.position
+
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.next_position = self.get_position(results[-1]) if self.has_next and results else None
+        self.previous_position = self.get_position(results[0]) if self.has_previous and results else None
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, view):
+        get_cursor_ordering = getattr(view, "get_cursor_ordering", None)
+        return tuple(get_cursor_ordering()) if get_cursor_ordering else self.ordering
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_position(self, instance):
+        if isinstance(instance, Mapping):
+            return [instance[field.lstrip("-")] for field in self.ordering]
+        return [getattr(instance, field.lstrip("-")) for field in self.ordering]
+
+    @staticmethod
+    def flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def filter_after(queryset, ordering, position):
+        # (a, b) after (x, y) is a <= x AND (a < x OR b < y) for descending keys; the leading range keeps the
+        # condition usable as an index bound, the OR only filters rows that tie on the first key
+        first, first_value = ordering[0], position[0]
+        first_name = first.lstrip("-")
+        lookup = "lt" if first.startswith("-") else "gt"
+        queryset = queryset.filter(**{f"{first_name}__{lookup}e": first_value})
+
+        after = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            after |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return queryset.filter(after)
+
+    @staticmethod
+    def serialize_value(value):
+        return value.isoformat() if isinstance(value, datetime) else value
+
+    def encode_cursor(self, position, reverse):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.make_cursor(position, reverse))
+
+    @classmethod
+    def make_cursor(cls, position, reverse=False):
+        payload = json.dumps({"p": [cls.serialize_value(value) for value in position], "r": int(reverse)})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            position, reverse = payload["p"], bool(payload["r"])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
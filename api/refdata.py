@@ -0,0 +1,123 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Country, Source
+
+REFDATA_VERSION_KEY = "refdata:version"
+
+_reference_data = None
+_deferred_bumps = threading.local()
+
+
+class ReferenceData:
+    """
+    Snapshot of the Country and Source tables, serialized once and keyed by id and api_id. Both tables are
+    small and only change when populate_countries/populate_sources run or an admin edits them.
+    """
+
+    def __init__(self, version, countries, sources):
+        # Imported here because the serializers module imports this one
+        from .serializers import CountrySerializer, SourceSerializer
+
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.countries = [dict(row) for row in CountrySerializer(countries, many=True).data]
+        self.sources = [dict(row) for row in SourceSerializer(sources, many=True).data]
+        self.countries_by_id = {row["id"]: row for row in self.countries}
+        self.sources_by_id = {row["id"]: row for row in self.sources}
+        self.country_ids_by_code = {country.code: country.id for country in countries}
+        self.source_ids_by_api_id = {source.api_id: source.id for source in sources}
+        self.source_country_ids = {source.id: source.country_id for source in sources}
+
+    @classmethod
+    def load(cls, version):
+        countries = list(Country.objects.order_by("name"))
+        sources = list(Source.objects.select_related("country").order_by("name"))
+        return cls(version, countries, sources)
+
+    @classmethod
+    async def aload(cls, version):
+        countries = [country async for country in Country.objects.order_by("name")]
+        sources = [source async for source in Source.objects.select_related("country").order_by("name")]
+        return cls(version, countries, sources)
+
+    def sources_in_countries(self, country_ids):
+        return [row for row in self.sources if self.source_country_ids[row["id"]] in country_ids]
+
+
+def is_current(reference_data, version):
+    # The age bound is a fallback for a cache that does not reach every process after all, e.g. per-host
+    # file caches behind a load balancer; with a shared cache the version stamp alone decides
+    return (
+        reference_data is not None
+        and reference_data.version == version
+        and time.monotonic() - reference_data.loaded_at < settings.REFDATA_MAX_AGE
+    )
+
+
+def get_reference_data():
+    """
+    Returns the process-wide reference data, reloading both tables in two queries when the shared version
+    stamp has moved or the snapshot is older than REFDATA_MAX_AGE seconds. Every process checks the stamp in
+    the Django cache, so a bump reaches all of them.
+    """
+    global _reference_data
+
+    version = get_reference_data_version()
+    reference_data = _reference_data
+    if not is_current(reference_data, version):
+        reference_data = _reference_data = ReferenceData.load(version)
+    return reference_data
+
+
+async def aget_reference_data():
+    """get_reference_data for async views, reading the stamp with the async cache and reloading with the async ORM."""
+    global _reference_data
+
+    version = await aget_reference_data_version()
+    reference_data = _reference_data
+    if not is_current(reference_data, version):
+        reference_data = _reference_data = await ReferenceData.aload(version)
+    return reference_data
+
+
+def get_reference_data_version():
+    version = cache.get(REFDATA_VERSION_KEY)
+    if version is None:
+        cache.add(REFDATA_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(REFDATA_VERSION_KEY)
+    return version
+
+
+async def aget_reference_data_version():
+    """get_reference_data_version for async views, through the async cache API."""
+    version = await cache.aget(REFDATA_VERSION_KEY)
+    if version is None:
+        await cache.aadd(REFDATA_VERSION_KEY, time.time_ns(), timeout=None)
+        version = await cache.aget(REFDATA_VERSION_KEY)
+    return version
+
+
+def bump_reference_data_version():
+    """Called by the Country and Source signals; inside defer_reference_data_bump() it waits for the block to end."""
+    if getattr(_deferred_bumps, "depth", 0):
+        _deferred_bumps.pending = True
+        return
+    cache.set(REFDATA_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+@contextmanager
+def defer_reference_data_bump():
+    """Turns the version bumps of every row saved or deleted in the block, e.g. by a bulk load, into one at the end."""
+    _deferred_bumps.depth = getattr(_deferred_bumps, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _deferred_bumps.depth -= 1
+        if not _deferred_bumps.depth and getattr(_deferred_bumps, "pending", False):
+            _deferred_bumps.pending = False
+            bump_reference_data_version()
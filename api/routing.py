@@ -0,0 +1,203 @@
+import re
+from collections import defaultdict, deque, namedtuple
+from itertools import compress
+
+from .models import UserPreference
+
+# A keyword shared by at least 1/DENSE_RATIO of all users is stored as a dense bitmap, rarer ones as positions
+DENSE_RATIO = 64
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+_BIT_BYTES = bytes.maketrans(b"01", b"\x00\x01")
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+UserRoute = namedtuple("UserRoute", ["user_id", "username", "countries", "sources", "keywords"])
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed list of keywords. ``match`` scans a text once and returns the ids
+    (positions in ``keywords``) of every keyword that occurs in it as a substring, so the result is the same as
+    testing ``keyword in text`` for each keyword.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            if keyword:
+                self._insert(keyword, keyword_id)
+        self._build_failure_links()
+
+    def _insert(self, keyword, keyword_id):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] += (keyword_id,)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+
+                self._fail[next_state] = fail
+                if self._output[fail]:
+                    self._output[next_state] += self._output[fail]
+
+    def match(self, text):
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        matched = set()
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                matched.update(output[state])
+
+        return matched
+
+
+class RoutingIndex:
+    """
+    Routes an article to the users whose source and keyword preferences match it. Users are numbered by
+    position and user sets are held as bitmaps in Python ints, so unions and intersections run over machine
+    words instead of hashing user ids into new sets for every article.
+    """
+
+    def __init__(self, users):
+        self.user_ids = []
+        positions_by_source = defaultdict(list)
+        positions_by_keyword = defaultdict(list)
+        no_sources = []
+        no_keywords = []
+
+        for user_id, source_api_ids, keywords in users:
+            position = len(self.user_ids)
+            self.user_ids.append(user_id)
+
+            source_api_ids = set(source_api_ids)
+            if source_api_ids:
+                for source_api_id in source_api_ids:
+                    positions_by_source[source_api_id].append(position)
+            else:
+                no_sources.append(position)
+
+            keywords = {kw.lower().strip() for kw in keywords or [] if kw and kw.strip()}
+            if keywords:
+                for keyword in keywords:
+                    positions_by_keyword[keyword].append(position)
+            else:
+                no_keywords.append(position)
+
+        self._size = (len(self.user_ids) + 7) // 8
+        self._dense_threshold = max(1, len(self.user_ids) // DENSE_RATIO)
+
+        self._no_sources = self._bitmap(no_sources)
+        self._no_keywords = self._bitmap(no_keywords)
+        self._source_users = {
+            source_api_id: self._bitmap(positions) | self._no_sources
+            for source_api_id, positions in positions_by_source.items()
+        }
+
+        self.keyword_matcher = KeywordMatcher(positions_by_keyword)
+        self._keyword_users = [
+            self._bitmap(positions) if len(positions) >= self._dense_threshold else tuple(positions)
+            for positions in positions_by_keyword.values()
+        ]
+
+    def _bitmap(self, positions):
+        buffer = bytearray(self._size)
+        for position in positions:
+            buffer[position >> 3] |= 1 << (position & 7)
+        return int.from_bytes(buffer, "little")
+
+    def match(self, source_api_id, text):
+        source_users = self._source_users.get(source_api_id, self._no_sources) if source_api_id else self._no_sources
+        if not source_users:
+            return []
+
+        keyword_users = self._no_keywords
+        sparse_positions = []
+        for keyword_id in self.keyword_matcher.match(text):
+            users = self._keyword_users[keyword_id]
+            if isinstance(users, int):
+                keyword_users |= users
+            else:
+                sparse_positions.extend(users)
+        if sparse_positions:
+            keyword_users |= self._bitmap(sparse_positions)
+
+        return self.user_ids_of(source_users & keyword_users)
+
+    def user_ids_of(self, bitmap):
+        if not bitmap:
+            return []
+
+        user_ids = self.user_ids
+        if bitmap.bit_count() * 8 >= len(user_ids):
+            # Dense result: expand the bitmap into one 0/1 byte per user and let compress() pick the ids
+            return list(compress(user_ids, bin(bitmap)[:1:-1].encode().translate(_BIT_BYTES)))
+
+        data = bitmap.to_bytes(self._size, "little")
+        return [
+            user_ids[(match.start() << 3) + bit]
+            for match in _NONZERO_BYTE.finditer(data)
+            for bit in _BYTE_BITS[data[match.start()]]
+        ]
+
+
+class RoutingSnapshot:
+    """
+    Every user's routing preferences, read with one flat query per table instead of walking UserPreference
+    relations user by user. ``countries`` holds (country_id, code) pairs and ``sources`` (api_id, country_id)
+    pairs, so fetch_news plans its queries and routes articles from the same snapshot without touching the ORM.
+    """
+
+    def __init__(self, users):
+        self.users = list(users)
+
+    @classmethod
+    def load(cls):
+        countries = defaultdict(list)
+        for preference_id, country_id, code in UserPreference.preferred_countries.through.objects.values_list(
+            "userpreference_id", "country_id", "country__code"
+        ):
+            countries[preference_id].append((country_id, code))
+
+        sources = defaultdict(list)
+        for preference_id, api_id, country_id in UserPreference.preferred_sources.through.objects.values_list(
+            "userpreference_id", "source__api_id", "source__country_id"
+        ):
+            sources[preference_id].append((api_id, country_id))
+
+        return cls(
+            UserRoute(user_id, username, countries[preference_id], sources[preference_id], keywords)
+            for preference_id, user_id, username, keywords in UserPreference.objects.order_by("id").values_list(
+                "id", "user_id", "user__username", "keywords"
+            )
+        )
+
+    def routing_users(self):
+        """(user_id, source_api_ids, keywords) for every user, as RoutingIndex expects them."""
+        return ((user.user_id, [api_id for api_id, _ in user.sources], user.keywords) for user in self.users)
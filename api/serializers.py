@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
+from drf_spectacular.utils import extend_schema_field
 from .models import UserPreference, Article, UserArticle, Source, Country
+from .refdata import get_reference_data
 from rest_framework.authtoken.models import Token
 
 User = get_user_model()
@@ -87,9 +89,41 @@ class SourceSerializer(serializers.ModelSerializer):
                   'language', 'country_code', 'country_name')
 
 
+class ReferenceDataListField(serializers.Field):
+    """
+    Read-only list of related countries or sources rendered from the reference-data cache, so only the related
+    ids have to be loaded. Rows missing from the cache fall back to the model serializer.
+    """
+
+    def __init__(self, rows_by_id, serializer_class, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.rows_by_id = rows_by_id
+        self.serializer_class = serializer_class
+
+    def to_representation(self, manager):
+        rows_by_id = getattr(get_reference_data(), self.rows_by_id)
+        return [
+            rows_by_id.get(obj.pk) or self.serializer_class(obj).data
+            for obj in manager.all()
+        ]
+
+
+@extend_schema_field(CountrySerializer(many=True))
+class ReferenceCountriesField(ReferenceDataListField):
+    def __init__(self, **kwargs):
+        super().__init__('countries_by_id', CountrySerializer, **kwargs)
+
+
+@extend_schema_field(SourceSerializer(many=True))
+class ReferenceSourcesField(ReferenceDataListField):
+    def __init__(self, **kwargs):
+        super().__init__('sources_by_id', SourceSerializer, **kwargs)
+
+
 class UserPreferenceSerializer(serializers.ModelSerializer):
-    preferred_countries = CountrySerializer(many=True, read_only=True)
-    preferred_sources = SourceSerializer(many=True, read_only=True)
+    preferred_countries = ReferenceCountriesField()
+    preferred_sources = ReferenceSourcesField()
     preferred_country_codes = serializers.ListField(
         child=serializers.CharField(max_length=2), write_only=True, required=False
     )
@@ -144,6 +178,51 @@ class ArticleSerializer(serializers.ModelSerializer):
         ]
 
 
+class ArticleListSerializer(serializers.BaseSerializer):
+    """
+    Read-only fast path for article lists. Works on ``Article.objects.values(*ArticleListSerializer.values)``
+    rows and builds the same JSON as ArticleSerializer without instantiating models or running per-field
+    serializer machinery. A source without a country has no country_code/country_name keys, as in
+    SourceSerializer.
+    """
+
+    values = (
+        'id', 'title', 'summary', 'article_url', 'source_name', 'image_url', 'published_at', 'fetched_at',
+        'source_id', 'source__name', 'source__api_id', 'source__description', 'source__url', 'source__category',
+        'source__language', 'source__country_id', 'source__country__code', 'source__country__name',
+    )
+    datetime_field = serializers.DateTimeField()
+
+    def to_representation(self, row):
+        to_datetime = self.datetime_field.to_representation
+        source = None
+        if row['source_id'] is not None:
+            source = {
+                'id': row['source_id'],
+                'name': row['source__name'],
+                'api_id': row['source__api_id'],
+                'description': row['source__description'],
+                'url': row['source__url'],
+                'category': row['source__category'],
+                'language': row['source__language'],
+            }
+            if row['source__country_id'] is not None:
+                source['country_code'] = row['source__country__code']
+                source['country_name'] = row['source__country__name']
+
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'summary': row['summary'],
+            'article_url': row['article_url'],
+            'source_name': row['source_name'],
+            'source': source,
+            'image_url': row['image_url'],
+            'published_at': to_datetime(row['published_at']) if row['published_at'] is not None else None,
+            'fetched_at': to_datetime(row['fetched_at']) if row['fetched_at'] is not None else None,
+        }
+
+
 class UserRegistrationWithEmailSerializer(serializers.Serializer):
     username_email = serializers.CharField(max_length=150)
     password = serializers.CharField(write_only=True)
@@ -1,64 +1,94 @@
-from rest_framework.authtoken.models import Token
-from .models import User, Country, Source, UserPreference
+from django.db import IntegrityError, transaction
+from .models import User, UserPreference
+from .refdata import get_reference_data
 import re
 
+USERNAME_ATTEMPTS = 3
+
+DEFAULT_COUNTRY_CODES = ['nz']
+DEFAULT_SOURCE_API_IDS = ['bbc-news', 'cnn']
+
 
 class AuthService:
     
     @staticmethod
     def create_user_with_preferences(username_email, password, first_name='', last_name=''):
-        is_email = AuthService._is_valid_email(username_email)
-        
-        if is_email:
-            username = AuthService._generate_unique_username_from_email(username_email)
-            user = User.objects.create_user(
-                username=username,
-                email=username_email,
-                password=password,
-                first_name=first_name,
-                last_name=last_name
-            )
-        else:
-            user = User.objects.create_user(
-                username=username_email,
-                password=password,
-                first_name=first_name,
-                last_name=last_name
-            )
-        
-        token, _ = Token.objects.get_or_create(user=user)
-        
-        AuthService._setup_default_preferences(user)
-        
-        return user, token
+        # The post_save signals create the token and preferences and cache them on the user, so neither is read
+        # back. One transaction, so a failed step leaves no half-registered user behind.
+        with transaction.atomic():
+            if AuthService._is_valid_email(username_email):
+                user = AuthService._create_user_from_email(username_email, password, first_name, last_name)
+            else:
+                user = User.objects.create_user(
+                    username=username_email,
+                    password=password,
+                    first_name=first_name,
+                    last_name=last_name
+                )
+
+            AuthService._setup_default_preferences(user.preferences)
+
+        return user, user.auth_token
     
     @staticmethod
     def _is_valid_email(email):
         email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
         return re.match(email_pattern, email) is not None
     
+    @staticmethod
+    def _create_user_from_email(email, password, first_name='', last_name=''):
+        # A concurrent signup can take the generated username between the lookup and the insert; the loser
+        # generates the next one and tries again
+        for attempt in range(USERNAME_ATTEMPTS):
+            username = AuthService._generate_unique_username_from_email(email)
+            try:
+                with transaction.atomic():
+                    return User.objects.create_user(
+                        username=username,
+                        email=email,
+                        password=password,
+                        first_name=first_name,
+                        last_name=last_name
+                    )
+            except IntegrityError:
+                if attempt == USERNAME_ATTEMPTS - 1 or not User.objects.filter(username=username).exists():
+                    raise
+
     @staticmethod
     def _generate_unique_username_from_email(email):
         username = email.split('@')[0]
+        # One query for the local part and its numeric suffixes only, then the first free suffix in memory.
+        # A plain prefix match would also fetch every longer name, e.g. all "johnny*" users for "john".
+        taken = set(
+            User.objects.filter(username__regex=rf'^{re.escape(username)}\d*$').values_list('username', flat=True)
+        )
         counter = 1
         original_username = username
-        while User.objects.filter(username=username).exists():
+        while username in taken:
             username = f"{original_username}{counter}"
             counter += 1
         return username
     
     @staticmethod
-    def _setup_default_preferences(user):
-        user_pref = UserPreference.objects.get(user=user)
-        
-        try:
-            default_country_nz = Country.objects.get(code='nz')
-            user_pref.preferred_countries.add(default_country_nz)
-        except Country.DoesNotExist:
-            pass
-        
-        try:
-            default_sources = Source.objects.filter(api_id__in=['bbc-news', 'cnn'])
-            user_pref.preferred_sources.add(*default_sources)
-        except Source.DoesNotExist:
-            pass
+    def _setup_default_preferences(user_pref):
+        # Ids come from the cached reference data and each through table gets a single insert
+        reference_data = get_reference_data()
+        country_ids = [
+            reference_data.country_ids_by_code[code]
+            for code in DEFAULT_COUNTRY_CODES
+            if code in reference_data.country_ids_by_code
+        ]
+        source_ids = [
+            reference_data.source_ids_by_api_id[api_id]
+            for api_id in DEFAULT_SOURCE_API_IDS
+            if api_id in reference_data.source_ids_by_api_id
+        ]
+
+        country_links = UserPreference.preferred_countries.through
+        source_links = UserPreference.preferred_sources.through
+        country_links.objects.bulk_create(
+            country_links(userpreference_id=user_pref.id, country_id=country_id) for country_id in country_ids
+        )
+        source_links.objects.bulk_create(
+            source_links(userpreference_id=user_pref.id, source_id=source_id) for source_id in source_ids
+        )
@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
-from .models import User, UserPreference
+
+from conf.utils import evict_cached_tokens
+from .cache import bump_feed_versions
+from .models import Country, Source, User, UserPreference, UserArticle
+from .refdata import bump_reference_data_version
 
 
 @receiver(post_save, sender=User)
@@ -14,3 +18,31 @@ def create_auth_token(sender, instance=None, created=False, **kwargs):
 def create_user_preference_spec(sender, instance, created, **kwargs):
     if created:
         UserPreference.objects.create(user=instance)
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    evict_cached_tokens([instance.key])
+
+
+@receiver(post_save, sender=User)
+def evict_user_tokens(sender, instance, created, **kwargs):
+    # The cached credentials hold a copy of the user, so any change, deactivation included, drops them. The
+    # last_login update of every login is left alone.
+    if not created and kwargs.get("update_fields") != frozenset({"last_login"}):
+        evict_cached_tokens(Token.objects.filter(user=instance).values_list("key", flat=True))
+
+
+@receiver(post_save, sender=UserArticle)
+@receiver(post_delete, sender=UserArticle)
+def invalidate_feed_cache(sender, instance, **kwargs):
+    # fetch_news bulk-creates links without signals and bumps the versions itself
+    bump_feed_versions([instance.user_id])
+
+
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+@receiver(post_save, sender=Source)
+@receiver(post_delete, sender=Source)
+def invalidate_reference_data(sender, **kwargs):
+    bump_reference_data_version()
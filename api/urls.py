@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework import routers
 
-from . import views
+from . import async_views, views
 from .auth import AuthViewSet
 
 router = routers.DefaultRouter()
@@ -14,4 +14,11 @@ router.register(r"articles", views.ArticleViewSet, basename="article")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path(
+        "async/articles/personalized-feed/",
+        async_views.personalized_feed,
+        name="async-article-personalized-feed",
+    ),
+    path("async/countries/", async_views.country_list, name="async-country-list"),
+    path("async/sources/", async_views.source_list, name="async-source-list"),
 ]
@@ -0,0 +1,101 @@
+import hashlib
+import time
+import uuid
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+# Only bounds how long the cache fallback outlives a crashed holder; PostgreSQL locks die with the session
+LOCK_TIMEOUT = 60 * 60
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def track_stage(stats, name):
+    counter = QueryCounter()
+    started = time.perf_counter()
+    with connection.execute_wrapper(counter):
+        yield
+    stage_stats = stats.setdefault(name, {"queries": 0, "elapsed": 0.0})
+    stage_stats["queries"] += counter.count
+    stage_stats["elapsed"] += time.perf_counter() - started
+
+
+@contextmanager
+def count_queries():
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        yield counter
+
+
+@contextmanager
+def rolled_back():
+    """Runs the block in a transaction that is always rolled back, e.g. to seed data for a benchmark."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def assert_queries_do_not_grow(fetch, sizes=(1, 20, 100), prepare=None):
+    """
+    Calls ``fetch(size)`` for each size, e.g. a list endpoint at that page size, and raises AssertionError when
+    the number of queries is not the same for all of them. ``prepare(size)``, if given, runs uncounted before
+    each fetch. Returns the query count per size.
+    """
+    counts = {}
+    for size in sizes:
+        if prepare:
+            prepare(size)
+        with count_queries() as counter:
+            fetch(size)
+        counts[size] = counter.count
+    if len(set(counts.values())) > 1:
+        raise AssertionError(f"Query count grows with size: {counts}")
+    return counts
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+@contextmanager
+def advisory_lock(name, timeout=LOCK_TIMEOUT):
+    """
+    Non-blocking lock shared by every process on the database, yielding whether it was acquired. Uses a
+    PostgreSQL session-level advisory lock, and falls back to ``cache.add`` on other backends, which only
+    excludes other processes when the cache is shared (CACHE_URL).
+    """
+    if connection.vendor == "postgresql":
+        key = int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", [key])
+            acquired = cursor.fetchone()[0]
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", [key])
+        return
+
+    cache_key = f"lock:{name}"
+    token = uuid.uuid4().hex
+    acquired = cache.add(cache_key, token, timeout=timeout)
+    try:
+        yield acquired
+    finally:
+        # Checked so a holder whose lock expired does not release the next holder's
+        if acquired and cache.get(cache_key) == token:
+            cache.delete(cache_key)
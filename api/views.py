@@ -1,25 +1,46 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Page
+from django.db.models import F, Prefetch
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from rest_framework import viewsets, permissions, mixins
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from .filters import PersonalizedFeedFilter, SourceFilter
-from .models import Country, Source, UserPreference, Article, UserArticle
+from .cache import feed_page_key
+from .conditional import (
+    article_list_etag,
+    article_list_last_modified,
+    feed_etag,
+    feed_last_modified,
+    reference_data_etag,
+    reference_data_last_modified,
+)
+from .filters import PersonalizedFeedFilter, SourceFilter, parse_id_list
+from .models import Country, Source, UserPreference, Article
+from .pagination import KeysetPagination
+from .refdata import get_reference_data
 from .serializers import (
     UserSerializer,
     CountrySerializer,
     SourceSerializer,
     UserPreferenceSerializer,
     ArticleSerializer,
+    ArticleListSerializer,
 )
 
 User = get_user_model()
 
+FEED_CURSOR_ORDERING = ('-feed_published_at', '-feed_article_id')
+
 
 class UserViewSet(
     mixins.ListModelMixin,
@@ -43,18 +64,61 @@ class UserViewSet(
         )
 
 
-class CountryViewSet(viewsets.ReadOnlyModelViewSet):
+# Conditional GETs are answered from version stamps before the view runs, see api.conditional
+reference_data_condition = condition(etag_func=reference_data_etag, last_modified_func=reference_data_last_modified)
+
+
+class ReferenceDataViewSetMixin:
+    """
+    Serves plain list and detail requests from the reference-data cache. ``reference_rows`` and
+    ``reference_rows_by_id`` name the ReferenceData attributes holding the rows, and ``cached_filter_params``
+    maps each id-list filter answered from the cache to the ReferenceData method selecting its rows. Requests
+    using pagination, ordering or other filters fall through to the database.
+    """
+    reference_rows = None
+    reference_rows_by_id = None
+    cached_filter_params = {}
+
+    @method_decorator(reference_data_condition)
+    def list(self, request, *args, **kwargs):
+        if set(request.query_params) <= self.cached_filter_params.keys():
+            reference_data = get_reference_data()
+            rows = getattr(reference_data, self.reference_rows)
+            for param, select_rows in self.cached_filter_params.items():
+                ids = parse_id_list(request.query_params.get(param))
+                if ids:
+                    selected = {row['id'] for row in getattr(reference_data, select_rows)(set(ids))}
+                    rows = [row for row in rows if row['id'] in selected]
+            return Response(rows)
+        return super().list(request, *args, **kwargs)
+
+    @method_decorator(reference_data_condition)
+    def retrieve(self, request, *args, **kwargs):
+        rows_by_id = getattr(get_reference_data(), self.reference_rows_by_id)
+        pk = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        row = rows_by_id.get(int(pk)) if str(pk).isdigit() else None
+        if row is not None and not request.query_params:
+            return Response(row)
+        return super().retrieve(request, *args, **kwargs)
+
+
+class CountryViewSet(ReferenceDataViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Country.objects.all()
     serializer_class = CountrySerializer
     permission_classes = [permissions.IsAuthenticated]
+    reference_rows = 'countries'
+    reference_rows_by_id = 'countries_by_id'
 
 
-class SourceViewSet(viewsets.ReadOnlyModelViewSet):
+class SourceViewSet(ReferenceDataViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Source.objects.select_related('country').all()
     serializer_class = SourceSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_class = SourceFilter
     ordering = ['name']
+    reference_rows = 'sources'
+    reference_rows_by_id = 'sources_by_id'
+    cached_filter_params = {'country_id': 'sources_in_countries'}
 
 
 class UserPreferenceViewSet(viewsets.ModelViewSet):
@@ -64,11 +128,17 @@ class UserPreferenceViewSet(viewsets.ModelViewSet):
     http_method_names = ["get", "put", "patch"]
 
     def get_queryset(self):
-        return UserPreference.objects.filter(user=self.request.user)
+        # Only the related ids are loaded; the serializer renders them from the reference-data cache
+        return UserPreference.objects.filter(user=self.request.user).prefetch_related(
+            Prefetch('preferred_countries', queryset=Country.objects.only('id')),
+            Prefetch('preferred_sources', queryset=Source.objects.only('id')),
+        )
 
     @action(detail=False, methods=["get"])
     def my_preferences(self, request):
-        preference, created = UserPreference.objects.get_or_create(user=request.user)
+        preference = self.get_queryset().first()
+        if preference is None:
+            preference = UserPreference.objects.create(user=request.user)
         serializer = self.get_serializer(preference)
         return Response(serializer.data)
 
@@ -78,7 +148,8 @@ class UserPreferenceViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(preference, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
-        return Response(serializer.data)
+        # Re-read with the prefetches so the response does not load each source's country separately
+        return Response(self.get_serializer(self.get_queryset().get(pk=preference.pk)).data)
 
 
 class ArticlePagination(PageNumberPagination):
@@ -86,38 +157,104 @@ class ArticlePagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = 100
 
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views: the count and the page are read with the async ORM."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Set before the Paginator runs its own, synchronous, COUNT
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        bottom = (number - 1) * page_size
+        rows = [row async for row in queryset[bottom:bottom + page_size]]
+        self.page = Page(rows, number, paginator)
+        return rows
+
+
+def get_feed_queryset(request, user):
+    """The user's feed as values() rows in feed order, filtered by the PersonalizedFeedFilter query params."""
+    # Walks the user's (user, published_at, article) feed index instead of sorting their whole history
+    articles = Article.objects.filter(
+        users_in_feed__user=user
+    ).annotate(
+        feed_published_at=F('users_in_feed__published_at'),
+        feed_article_id=F('users_in_feed__article_id'),
+    ).order_by(*FEED_CURSOR_ORDERING)
+    filterset = PersonalizedFeedFilter(request.GET, queryset=articles, request=request)
+    if filterset.is_valid():
+        articles = filterset.qs
+    return articles.values(*ArticleListSerializer.values, 'feed_published_at', 'feed_article_id')
+
 
 class ArticleViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ArticleSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     pagination_class = ArticlePagination
-    queryset = Article.objects.select_related('source').all()
+    cursor_pagination_class = KeysetPagination
+    queryset = Article.objects.select_related('source__country').all()
 
     def get_queryset(self):
         queryset = super().get_queryset()
         return queryset
 
+    @property
+    def paginator(self):
+        """Page numbers by default; keyset pagination when the client sends ?cursor= or ?pagination=cursor."""
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if 'cursor' in params or params.get('pagination') == 'cursor':
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    @method_decorator(condition(etag_func=article_list_etag, last_modified_func=article_list_last_modified))
+    def list(self, request, *args, **kwargs):
+        if isinstance(self.paginator, KeysetPagination) and request.query_params.get('search', '').strip():
+            # Search results are ordered by relevance, which a (published_at, id) cursor cannot page through
+            raise ValidationError({'search': 'Search results are paged by page number, not by cursor.'})
+        return self.get_list_response(self.get_list_queryset())
+
+    def get_list_queryset(self):
+        # Lists are read as values() rows and rendered by the lean serializer; retrieve keeps ArticleSerializer
+        return self.filter_queryset(self.get_queryset()).values(*ArticleListSerializer.values)
+
+    def get_list_response(self, queryset):
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(ArticleListSerializer(page, many=True).data)
+        return Response(ArticleListSerializer(queryset, many=True).data)
+
+    def get_cursor_ordering(self):
+        if self.action == 'personalized_feed':
+            return FEED_CURSOR_ORDERING
+        return ('-published_at', '-id')
+
     @action(
         detail=False,
         methods=["get"],
         permission_classes=[permissions.IsAuthenticated],
         url_path="personalized-feed",
     )
+    @method_decorator(condition(etag_func=feed_etag, last_modified_func=feed_last_modified))
     def personalized_feed(self, request):
         user = request.user
-        user_articles = UserArticle.objects.filter(user=user).values_list('article_id', flat=True)
-        articles = Article.objects.filter(
-            id__in=user_articles
-        ).select_related('source').order_by("-published_at")
-        filterset = PersonalizedFeedFilter(request.GET, queryset=articles, request=request)
-        if filterset.is_valid():
-            articles = filterset.qs
-        
-        page = self.paginate_queryset(articles)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        cache_key = feed_page_key(user.id, request)
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
 
-        serializer = self.get_serializer(articles, many=True)
-        return Response(serializer.data)
+        response = self.get_list_response(get_feed_queryset(request, user))
+        if isinstance(response.data, dict):
+            data = {**response.data, 'results': list(response.data['results'])}
+        else:
+            data = list(response.data)
+
+        cache.set(cache_key, data, settings.FEED_CACHE_TIMEOUT)
+        return Response(data)
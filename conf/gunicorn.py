@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for SERVER_MODE=production (WSGI) and SERVER_MODE=asgi (uvicorn workers), see
+entrypoint.sh. Every setting can be overridden from the environment, e.g. WEB_WORKERS=8 WEB_THREADS=4.
+"""
+import multiprocessing
+import os
+
+asgi = os.environ.get("SERVER_MODE") == "asgi"
+
+wsgi_app = "conf.asgi:application" if asgi else "conf.wsgi:application"
+bind = os.environ.get("WEB_BIND", "0.0.0.0:8000")
+
+workers = int(os.environ.get("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+# An ASGI worker runs one event loop; threads only apply to WSGI workers
+threads = int(os.environ.get("WEB_THREADS", 4))
+if asgi:
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    worker_class = "gthread" if threads > 1 else "sync"
+
+# Workers are recycled now and then to bound memory growth, with jitter so they do not all restart at once
+max_requests = int(os.environ.get("WEB_MAX_REQUESTS", 5000))
+max_requests_jitter = max_requests // 10
+
+# Open connections per worker, idle keep-alive ones included; a gthread worker at the limit stops reading requests
+worker_connections = int(os.environ.get("WEB_WORKER_CONNECTIONS", 1000))
+
+timeout = int(os.environ.get("WEB_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("WEB_KEEPALIVE", 5))
+
+# The app is loaded in each worker, so no database connection is opened before the fork and shared between workers.
+# Each request thread keeps its own connection, which Django closes at the end of a request once it is older than
+# DB_CONN_MAX_AGE; the rest close with the worker process.
+preload_app = False
+
+accesslog = os.environ.get("WEB_ACCESS_LOG", "-") or None
+errorlog = "-"
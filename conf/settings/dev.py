@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 import os
+import tempfile
 from loguru import logger
 from dotenv import load_dotenv
 from pathlib import Path
@@ -103,6 +104,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "api.middleware.QueryCountMiddleware",
 ]
 
 ROOT_URLCONF = "conf.urls"
@@ -167,7 +169,7 @@ REST_FRAMEWORK = {
         "rest_framework.renderers.BrowsableAPIRenderer",
     ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "conf.utils.CachedTokenAuthentication",
     ),
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.AnonRateThrottle",
@@ -195,7 +197,13 @@ DATABASES = {
         "PASSWORD": os.environ.get("DB_PASSWORD"),
         "HOST": os.environ.get("DB_HOST"),
         "PORT": os.environ.get("DB_PORT"),
-        "CONN_MAX_AGE": None,
+        # Seconds a connection is reused by its worker thread; unset keeps it for the life of the worker. Under
+        # ASGI the async ORM opens connections in short-lived threads, so they are closed after each request
+        "CONN_MAX_AGE": (
+            int(os.environ["DB_CONN_MAX_AGE"]) if os.environ.get("DB_CONN_MAX_AGE")
+            else 0 if os.environ.get("SERVER_MODE") == "asgi"
+            else None
+        ),
         "CONN_HEALTH_CHECKS": True,
     }
 }
@@ -252,3 +260,35 @@ SPECTACULAR_SETTINGS = {
 }
 
 NEWSAPI_KEY = os.environ.get("NEWSAPI_KEY")
+NEWSAPI_BASE_URL = os.environ.get("NEWSAPI_BASE_URL", "https://newsapi.org/v2")
+NEWSAPI_FETCH_CONCURRENCY = int(os.environ.get("NEWSAPI_FETCH_CONCURRENCY", 8))
+NEWSAPI_POOL_SIZE = int(os.environ.get("NEWSAPI_POOL_SIZE", NEWSAPI_FETCH_CONCURRENCY))
+NEWSAPI_TIMEOUT = float(os.environ.get("NEWSAPI_TIMEOUT", 30))
+NEWSAPI_MAX_RETRIES = int(os.environ.get("NEWSAPI_MAX_RETRIES", 3))
+NEWSAPI_BACKOFF_FACTOR = float(os.environ.get("NEWSAPI_BACKOFF_FACTOR", 0.5))
+NEWSAPI_MAX_PAGES = int(os.environ.get("NEWSAPI_MAX_PAGES", 5))
+NEWSAPI_REQUEST_BUDGET = int(os.environ.get("NEWSAPI_REQUEST_BUDGET", 0))
+
+# Feed and reference-data version stamps and cached tokens must be seen by every process (web workers,
+# process_tasks), so the cache is always shared: Redis when CACHE_URL is set (redis://host:6379/0), otherwise
+# files under CACHE_DIR, which only the processes of one host share. The api.W001 check warns about local memory.
+# The file cache is for development only (conf.settings.prod requires CACHE_URL): every write lists CACHE_DIR, and
+# past CACHE_MAX_ENTRIES it deletes a random 1/CULL_FREQUENCY of the entries, stamps, tokens and locks included.
+CACHE_URL = os.environ.get("CACHE_URL")
+CACHE_DIR = os.environ.get("CACHE_DIR", str(Path(tempfile.gettempdir()) / "newsapi-cache"))
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", 10000))
+CACHES = {
+    "default": (
+        {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": CACHE_URL}
+        if CACHE_URL
+        else {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": CACHE_DIR,
+            "OPTIONS": {"MAX_ENTRIES": CACHE_MAX_ENTRIES, "CULL_FREQUENCY": 10},
+        }
+    )
+}
+FEED_CACHE_TIMEOUT = int(os.environ.get("FEED_CACHE_TIMEOUT", 600))
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.environ.get("AUTH_TOKEN_CACHE_TIMEOUT", 300))
+REFDATA_MAX_AGE = int(os.environ.get("REFDATA_MAX_AGE", 600))
+QUERY_COUNT_WARNING = int(os.environ.get("QUERY_COUNT_WARNING", 50))  # 0 = never warn
@@ -1,3 +1,4 @@
+from django.core.exceptions import ImproperlyConfigured
 from loguru import logger
 
 # noinspection PyUnresolvedReferences
@@ -8,6 +9,10 @@ logger.info("DEBUG = {}", DEBUG)
 DEBUG_PROPAGATE_EXCEPTIONS = DEBUG
 if DEBUG:
     logger.warning("DEBUG enabled!")
+elif not CACHE_URL:
+    raise ImproperlyConfigured(
+        "CACHE_URL must point to Redis in production; the file cache of conf.settings.dev culls entries at random."
+    )
 
 SESSION_COOKIE_SAMESITE = "Lax"
 CSRF_COOKIE_SAMESITE = "Lax"
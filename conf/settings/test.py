@@ -0,0 +1,6 @@
+# noinspection PyUnresolvedReferences
+from .dev import *
+
+# Local memory, so each test run has a cache of its own that clearing between tests cannot share with a dev server
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+SILENCED_SYSTEM_CHECKS = ["api.W001"]
@@ -1,6 +1,50 @@
-from rest_framework import authentication
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.fields.files import FieldFile
+from django.utils.translation import gettext_lazy as _
+from rest_framework import authentication, exceptions
 from rest_framework.pagination import PageNumberPagination
 
+TOKEN_CACHE_KEY = "auth:token:{key_hash}"
+
+
+def token_cache_key(key):
+    # Hashed, so raw tokens never show up in the cache's key space
+    return TOKEN_CACHE_KEY.format(key_hash=hashlib.sha256(key.encode()).hexdigest())
+
+
+def evict_cached_tokens(keys):
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+def pack_credentials(user, token):
+    """
+    The cached form of an authenticated (user, token) pair: plain field values, never the password hash, which
+    stays out of the shared cache. Groups and permissions are not cached either; has_perm still reads them.
+    """
+    user_fields = {}
+    for field in user._meta.concrete_fields:
+        if field.attname != "password":
+            value = getattr(user, field.attname)
+            user_fields[field.attname] = value.name if isinstance(value, FieldFile) else value
+    return {"user": user_fields, "key": token.key, "created": token.created}
+
+
+def unpack_credentials(token_model, credentials):
+    user_fields = credentials["user"]
+    user_model = get_user_model()
+    # The password is a deferred field: it loads on first access, and save() leaves it alone
+    user = user_model.from_db(DEFAULT_DB_ALIAS, list(user_fields), list(user_fields.values()))
+    token = token_model.from_db(
+        DEFAULT_DB_ALIAS, ["key", "user_id", "created"], [credentials["key"], user.pk, credentials["created"]]
+    )
+    token.user = user
+    return user, token
+
 
 class SessionAuthentication(authentication.SessionAuthentication):
     """
@@ -20,3 +64,41 @@ class SessionAuthentication(authentication.SessionAuthentication):
 class DynamicPagination(PageNumberPagination):
     page_query_param = "page"
     page_size_query_param = "pagesize"
+
+
+class CachedTokenAuthentication(authentication.TokenAuthentication):
+    """
+    TokenAuthentication that keeps the credentials of a key in the Django cache for AUTH_TOKEN_CACHE_TIMEOUT
+    seconds, so repeat requests authenticate without the Token/User query. Entries are evicted by the Token and
+    User signals in api.signals, so logout, token deletion, deactivation and any other saved change to the user
+    take effect on the next request in every process (the cache is shared, see the api.W001 check).
+
+    Changes that bypass those signals, such as QuerySet.update() on users, are picked up once the entry expires,
+    after AUTH_TOKEN_CACHE_TIMEOUT seconds at most. The cache backend bounds the number of entries.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        credentials = cache.get(cache_key)
+        if credentials is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, pack_credentials(user, token), settings.AUTH_TOKEN_CACHE_TIMEOUT)
+            return user, token
+        return unpack_credentials(self.get_model(), credentials)
+
+    async def aauthenticate_credentials(self, key):
+        """authenticate_credentials for async views, through the async cache API and ORM."""
+        model = self.get_model()
+        cache_key = token_cache_key(key)
+        credentials = await cache.aget(cache_key)
+        if credentials is None:
+            try:
+                token = await model.objects.select_related("user").aget(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+
+            await cache.aset(cache_key, pack_credentials(token.user, token), settings.AUTH_TOKEN_CACHE_TIMEOUT)
+            return token.user, token
+        return unpack_credentials(model, credentials)
@@ -27,5 +27,11 @@ python manage.py start_background_tasks
 echo "Starting Swagger documentation..."
 python manage.py spectacular --color --file schema.yml
 
+# exec so the server receives the container's SIGTERM and drains in-flight requests before exiting
+if [ "${SERVER_MODE:-development}" = "production" ] || [ "${SERVER_MODE}" = "asgi" ]; then
+    echo "Starting gunicorn..."
+    exec gunicorn --config conf/gunicorn.py
+fi
+
 echo "Starting Django server..."
-python manage.py runserver 0.0.0.0:8000
+exec python manage.py runserver 0.0.0.0:8000
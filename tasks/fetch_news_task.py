@@ -1,18 +1,100 @@
+import time
+
 from background_task import background
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 from loguru import logger
 
 from api.management.commands.fetch_news import Command
+from api.models import Country
+
+CYCLE_KEY = "fetch_news:cycle"
+SHARD_RESULTS_TIMEOUT = 24 * 60 * 60
+
+
+def shard_result_key(cycle, country_code):
+    return f"fetch_news:cycle:{cycle}:{country_code}"
 
 
 @background(schedule=10)
 def fetch_news_task():
+    """
+    Coordinator: reports the shard timings of the previous cycle, then schedules one fetch_news_shard_task per
+    country with readers, so every process_tasks worker can pick up a share of the cycle.
+    """
     logger.info(f"Running scheduled news fetch task at {timezone.now()}")
 
     try:
-        cmd = Command()
-        cmd.handle()
+        report_cycle(cache.get(CYCLE_KEY))
+
+        country_codes = sorted(
+            code.lower()
+            for code in Country.objects.filter(userpreference__isnull=False).distinct().values_list("code", flat=True)
+        )
+        cycle = {"id": time.time_ns(), "countries": country_codes}
+        cache.set(CYCLE_KEY, cycle, timeout=SHARD_RESULTS_TIMEOUT)
+
+        # The run's request budget is split between the shards instead of granted to each of them
+        budget = None
+        if settings.NEWSAPI_REQUEST_BUDGET and country_codes:
+            budget = max(1, settings.NEWSAPI_REQUEST_BUDGET // len(country_codes))
+        for country_code in country_codes:
+            fetch_news_shard_task(cycle["id"], country_code, budget)
+        logger.info(f"Scheduled {len(country_codes)} fetch_news shards for cycle {cycle['id']}")
     except Exception as e:
         logger.error(f"Error running news fetch task: {e}")
 
     logger.info(f"Scheduled news fetch task completed at {timezone.now()}")
+
+
+@background(schedule=0)
+def fetch_news_shard_task(cycle_id, country_code, budget=None):
+    started = time.perf_counter()
+    result = {"status": "failed"}
+
+    try:
+        summary = Command().run(country_code=country_code, budget=budget)
+        result = {"status": summary["status"]}
+        if summary["status"] == "done":
+            result = {
+                "status": "done",
+                "articles": summary["articles"],
+                "new_articles": summary["new_articles"],
+                "new_links": summary["new_links"],
+                "requests": summary["requests"],
+            }
+    except Exception as e:
+        logger.error(f"Error running news fetch shard {country_code}: {e}")
+    finally:
+        result["elapsed"] = time.perf_counter() - started
+        cache.set(shard_result_key(cycle_id, country_code), result, timeout=SHARD_RESULTS_TIMEOUT)
+
+
+def report_cycle(cycle):
+    """Logs how long each shard of a cycle took; shards without a result are still queued or running."""
+    if not cycle:
+        return {}
+
+    results = cache.get_many([shard_result_key(cycle["id"], code) for code in cycle["countries"]])
+    report = {code: results.get(shard_result_key(cycle["id"], code)) for code in cycle["countries"]}
+    for country_code, result in report.items():
+        if result is None:
+            logger.warning(f"Cycle {cycle['id']} shard {country_code}: not finished")
+        elif result["status"] == "done":
+            logger.info(
+                f"Cycle {cycle['id']} shard {country_code}: {result['elapsed']:.1f}s, {result['articles']} articles, "
+                f"{result['new_links']} new links, {result['requests']} requests"
+            )
+        else:
+            logger.warning(
+                f"Cycle {cycle['id']} shard {country_code}: {result['status']} after {result['elapsed']:.1f}s"
+            )
+
+    finished = [result["elapsed"] for result in report.values() if result]
+    if finished:
+        logger.info(
+            f"Cycle {cycle['id']}: {len(finished)}/{len(report)} shards finished, slowest {max(finished):.1f}s, "
+            f"total {sum(finished):.1f}s"
+        )
+    return report
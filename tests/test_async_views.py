@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework import status
+
+from api.models import Article, Source, UserArticle
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def client(api_client, user_token):
+    api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+    return api_client
+
+
+@pytest.fixture
+def feed(user, articles):
+    for article in articles:
+        UserArticle.objects.create(user=user, article=article)
+    return articles
+
+
+class TestAsyncPersonalizedFeed:
+
+    def test_same_results_as_sync_view(self, client, feed):
+        params = {'page_size': 2, 'page': 2}
+
+        sync = client.get(reverse('article-personalized-feed'), params)
+        response = client.get(reverse('async-article-personalized-feed'), params)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data['count'] == sync.data['count'] == 5
+        assert data['results'] == sync.json()['results']
+        assert data['next'].startswith('http://testserver/api/async/articles/personalized-feed/')
+
+    def test_cursor_pagination(self, client, feed):
+        url = reverse('async-article-personalized-feed')
+
+        first = client.get(url, {'pagination': 'cursor', 'page_size': 3}).json()
+        second = client.get(first['next']).json()
+
+        assert [a['id'] for a in first['results'] + second['results']] == [a.id for a in feed]
+        assert second['next'] is None
+
+    def test_repeated_request_is_served_from_cache(self, client, feed, django_assert_num_queries):
+        url = reverse('async-article-personalized-feed')
+        first = client.get(url)
+
+        # The token and the page both come from the cache
+        with django_assert_num_queries(0):
+            second = client.get(url)
+
+        assert second.json() == first.json()
+
+    def test_source_change_invalidates_cached_page(self, client, user, source, articles):
+        Article.objects.filter(pk=articles[0].pk).update(source=source)
+        UserArticle.objects.create(user=user, article=articles[0])
+        url = reverse('async-article-personalized-feed')
+        first = client.get(url)
+
+        source.name = 'BBC World'
+        source.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['results'][0]['source']['name'] == 'BBC World'
+
+    def test_cache_is_not_used_on_the_event_loop(self, client, feed, monkeypatch):
+        blocking_calls = []
+        backend = type(caches['default'])
+        for name in ('get', 'set', 'add'):
+            def checked(self, *args, __name=name, __method=getattr(backend, name), **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                    blocking_calls.append(__name)
+                except RuntimeError:
+                    pass
+                return __method(self, *args, **kwargs)
+
+            monkeypatch.setattr(backend, name, checked)
+
+        for _ in range(2):
+            assert client.get(reverse('async-article-personalized-feed')).status_code == status.HTTP_200_OK
+            assert client.get(reverse('async-source-list')).status_code == status.HTTP_200_OK
+
+        assert blocking_calls == []
+
+    def test_matching_etag_is_not_modified(self, client, feed):
+        url = reverse('async-article-personalized-feed')
+        response = client.get(url)
+
+        revalidated = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_invalid_page_is_not_found(self, client, feed):
+        response = client.get(reverse('async-article-personalized-feed'), {'page': 10})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json()['detail'] == 'Invalid page.'
+
+    @pytest.mark.parametrize('authorization', [None, 'Token not-a-token'])
+    def test_requires_token(self, api_client, authorization):
+        if authorization:
+            api_client.credentials(HTTP_AUTHORIZATION=authorization)
+
+        response = api_client.get(reverse('async-article-personalized-feed'))
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response['WWW-Authenticate'] == 'Token'
+
+    def test_only_get_is_allowed(self, client):
+        response = client.post(reverse('async-article-personalized-feed'))
+
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+
+class TestAsyncReferenceData:
+
+    def test_same_body_as_sync_views(self, client, country, source):
+        Source.objects.create(api_id='nz-herald', name='NZ Herald', country=country)
+
+        for name, params in (('country-list', {}), ('source-list', {}), ('source-list', {'country_id': country.id})):
+            sync = client.get(reverse(name), params, HTTP_ACCEPT='application/json')
+            response = client.get(reverse(f'async-{name}'), params)
+
+            assert response.status_code == status.HTTP_200_OK
+            assert response.content == sync.content
@@ -1,10 +1,19 @@
 import pytest
 from django.urls import reverse
 from rest_framework import status
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
 from django.contrib.auth import get_user_model
 import re
 from rest_framework.test import APIClient
 
+from api.models import Source, UserPreference
+from api.refdata import get_reference_data
+from api import services
+from api.services import AuthService
+from conf.utils import CachedTokenAuthentication, token_cache_key
+
 User = get_user_model()
 
 # Apply django_db mark at module level
@@ -172,3 +181,151 @@ class TestLogin:
         }
         response = api_client.post(login_url, data, format='json')
         assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestRegistrationDefaults:
+
+    def test_links_default_country_and_sources(self, api_client, registration_url, country, source):
+        Source.objects.create(api_id='cnn', name='CNN')
+        Source.objects.create(api_id='reuters', name='Reuters')
+
+        response = api_client.post(
+            registration_url, {'username_email': 'new@example.com', 'password': 'securepw123'}, format='json'
+        )
+
+        preferences = UserPreference.objects.get(user_id=response.data['user_id'])
+        assert response.data['token'] == Token.objects.get(user_id=response.data['user_id']).key
+        assert [c.code for c in preferences.preferred_countries.all()] == ['nz']
+        assert sorted(s.api_id for s in preferences.preferred_sources.all()) == ['bbc-news', 'cnn']
+
+    def test_query_count(self, country, source, django_assert_max_num_queries):
+        get_reference_data()
+
+        # Username lookup, user, token, preferences, both link inserts and the savepoints around them
+        with django_assert_max_num_queries(10):
+            user, token = AuthService.create_user_with_preferences('new@example.com', 'securepw123')
+
+        assert token.user == user
+        assert user.preferences.preferred_sources.count() == 1
+
+    def test_failed_step_rolls_back_user(self, monkeypatch):
+        def fail(user_pref):
+            raise RuntimeError
+
+        monkeypatch.setattr(AuthService, '_setup_default_preferences', fail)
+
+        with pytest.raises(RuntimeError):
+            AuthService.create_user_with_preferences('new@example.com', 'securepw123')
+
+        assert not User.objects.filter(email='new@example.com').exists()
+
+
+class TestUsernameFromEmail:
+
+    def test_takes_first_free_suffix_in_one_query(self, django_assert_num_queries):
+        User.objects.bulk_create(User(username=name) for name in ['john', 'john1', 'john2', 'john4', 'johnny'])
+
+        with django_assert_num_queries(1):
+            username = AuthService._generate_unique_username_from_email('john@example.com')
+
+        assert username == 'john3'
+
+    def test_free_local_part_is_used_as_is(self):
+        User.objects.create_user(username='johnny')
+
+        assert AuthService._generate_unique_username_from_email('john@example.com') == 'john'
+
+    def test_only_numeric_suffixes_are_fetched(self, monkeypatch):
+        User.objects.bulk_create(User(username=name) for name in ['john', 'john2', 'johnny', 'johnny1', 'john1x'])
+        fetched = []
+        monkeypatch.setattr(services, 'set', lambda names: set(fetched.extend(names) or fetched), raising=False)
+
+        assert AuthService._generate_unique_username_from_email('john@example.com') == 'john1'
+        assert sorted(fetched) == ['john', 'john2']
+
+    def test_local_part_is_matched_literally(self):
+        User.objects.bulk_create(User(username=name) for name in ['j.hn', 'j+hn', 'j+hn1'])
+
+        assert AuthService._generate_unique_username_from_email('j.hn@example.com') == 'j.hn1'
+        assert AuthService._generate_unique_username_from_email('j+hn@example.com') == 'j+hn2'
+
+    def test_retries_when_a_concurrent_signup_takes_the_username(self, monkeypatch):
+        User.objects.create_user(username='john')
+        # The first lookup runs before the concurrent signup commits, so it still offers 'john'
+        names = iter(['john', 'john1'])
+        monkeypatch.setattr(AuthService, '_generate_unique_username_from_email', lambda email: next(names))
+
+        user, _ = AuthService.create_user_with_preferences('john@example.com', 'securepw123')
+
+        assert user.username == 'john1'
+        assert User.objects.filter(username__in=['john', 'john1']).count() == 2
+
+
+class TestTokenCache:
+
+    @pytest.fixture
+    def client(self, api_client, existing_user):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {existing_user.auth_token.key}')
+        api_client.get(reverse('user-current'))
+        return api_client
+
+    def test_hot_token_runs_no_query(self, client, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            response = client.get(reverse('user-current'))
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_logout_evicts_token(self, client):
+        response = client.post(reverse('auth-logout'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert client.get(reverse('user-current')).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_deactivation_evicts_token(self, client, existing_user):
+        existing_user.is_active = False
+        existing_user.save()
+
+        assert client.get(reverse('user-current')).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_user_changes_are_not_served_stale(self, client, existing_user):
+        existing_user.username = 'renamed'
+        existing_user.save()
+
+        assert client.get(reverse('user-current')).data['username'] == 'renamed'
+
+    def test_staff_change_is_not_served_stale(self, client, existing_user):
+        assert client.get(reverse('user-admins')).status_code == status.HTTP_403_FORBIDDEN
+
+        existing_user.is_staff = True
+        existing_user.save()
+
+        assert client.get(reverse('user-admins')).status_code == status.HTTP_200_OK
+
+    def test_permission_change_is_not_served_stale(self, client, existing_user):
+        authentication = CachedTokenAuthentication()
+        key = existing_user.auth_token.key
+        assert not authentication.authenticate_credentials(key)[0].has_perm('api.change_source')
+
+        existing_user.user_permissions.add(Permission.objects.get(codename='change_source'))
+
+        # Permissions are never cached, so the hot entry reads them afresh
+        assert authentication.authenticate_credentials(key)[0].has_perm('api.change_source')
+
+    def test_password_hash_is_not_cached(self, client, existing_user):
+        cached = cache.get(token_cache_key(existing_user.auth_token.key))
+
+        assert existing_user.password not in str(cached)
+        user, _ = CachedTokenAuthentication().authenticate_credentials(existing_user.auth_token.key)
+        user.first_name = 'Changed'
+        user.save()
+        existing_user.refresh_from_db()
+        assert existing_user.check_password('securepassword123')
+
+    def test_login_keeps_cached_token(self, client, login_url, additional_user_data, django_assert_num_queries):
+        APIClient().post(login_url, {
+            'identifier': additional_user_data['email'],
+            'password': additional_user_data['password'],
+        }, format='json')
+
+        with django_assert_num_queries(0):
+            client.get(reverse('user-current'))
@@ -0,0 +1,15 @@
+from api.checks import check_shared_cache
+
+
+def test_process_local_cache_is_warned_about(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+    assert [warning.id for warning in check_shared_cache(None)] == ["api.W001"]
+
+
+def test_shared_caches_pass(settings):
+    backends = ("django.core.cache.backends.filebased.FileBasedCache", "django.core.cache.backends.redis.RedisCache")
+    for backend in backends:
+        settings.CACHES = {"default": {"BACKEND": backend, "LOCATION": "unused"}}
+
+        assert check_shared_cache(None) == []
@@ -0,0 +1,537 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from background_task.models import Task
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from api.cache import get_feed_version
+from api.management.commands import fetch_news
+from api.management.commands.fetch_news import Command
+from api.models import Article, Country, FetchCursor, Source, UserArticle
+from api.newsapi import NewsAPIClient, RequestBudget
+from api.utils import advisory_lock
+from tasks.fetch_news_task import CYCLE_KEY, fetch_news_shard_task, fetch_news_task, report_cycle, shard_result_key
+
+User = get_user_model()
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def make_article(url, title="Car news", description="About cars"):
+    return {
+        "source": {"id": "bbc-news", "name": "BBC News"},
+        "title": title,
+        "description": description,
+        "url": url,
+        "urlToImage": None,
+        "publishedAt": "2025-01-01T10:00:00Z",
+    }
+
+
+@pytest.fixture
+def country_data():
+    return {
+        "nz": {"users": [1], "sources": ["bbc-news"], "keyword_batches": [["car"], ["automobile"]]},
+        "us": {"users": [2], "sources": ["cnn"], "keyword_batches": [["car"]]},
+    }
+
+
+def fetch_urls(command, country_data, concurrency, high_water_marks=None, budget=None):
+    pages = command.iter_article_pages(
+        country_data, concurrency, {} if high_water_marks is None else high_water_marks, budget
+    )
+    return [article["url"] for page in pages for article in page]
+
+
+def ok_response(articles):
+    return FakeResponse({"status": "ok", "totalResults": len(articles), "articles": articles})
+
+
+@pytest.mark.django_db
+class TestIterArticlePages:
+
+    def test_yields_pages_of_all_batches(self, settings, monkeypatch, country_data):
+        settings.NEWSAPI_KEY = "test-key"
+        calls = []
+
+        def fake_everything(client, params, timeout=None):
+            calls.append((params["sources"], params["q"]))
+            return ok_response([
+                make_article("https://example.com/shared"),
+                make_article(f"https://example.com/{params['sources']}/{params['q']}"),
+            ])
+
+        monkeypatch.setattr(NewsAPIClient, "everything", fake_everything)
+
+        urls = fetch_urls(Command(), country_data, concurrency=4)
+
+        assert len(calls) == 3
+        assert len(urls) == 6
+        assert set(urls) == {
+            "https://example.com/shared",
+            'https://example.com/bbc-news/"car"',
+            'https://example.com/bbc-news/"automobile"',
+            'https://example.com/cnn/"car"',
+        }
+
+    def test_respects_concurrency_limit(self, settings, monkeypatch, country_data):
+        settings.NEWSAPI_KEY = "test-key"
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+        barrier = threading.Event()
+
+        def fake_everything(client, params, timeout=None):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            barrier.wait(0.05)
+            with lock:
+                active["now"] -= 1
+            return ok_response([])
+
+        monkeypatch.setattr(NewsAPIClient, "everything", fake_everything)
+
+        fetch_urls(Command(), country_data, concurrency=2)
+
+        assert active["peak"] <= 2
+
+    def test_failed_batch_does_not_abort_run(self, settings, monkeypatch, country_data):
+        settings.NEWSAPI_KEY = "test-key"
+
+        def fake_everything(client, params, timeout=None):
+            if params["sources"] == "cnn":
+                raise ConnectionError("boom")
+            return ok_response([make_article("https://example.com/nz")])
+
+        monkeypatch.setattr(NewsAPIClient, "everything", fake_everything)
+
+        assert fetch_urls(Command(), country_data, concurrency=4) == ["https://example.com/nz"] * 2
+
+    def test_skips_articles_already_in_database(self, settings, monkeypatch, country_data):
+        settings.NEWSAPI_KEY = "test-key"
+        Article.objects.create(title="Known", article_url="https://example.com/known", published_at=timezone.now())
+
+        def fake_everything(client, params, timeout=None):
+            return ok_response([make_article("https://example.com/known"), make_article("https://example.com/new")])
+
+        monkeypatch.setattr(NewsAPIClient, "everything", fake_everything)
+
+        assert set(fetch_urls(Command(), country_data, concurrency=1)) == {"https://example.com/new"}
+
+    def test_stops_when_request_budget_is_spent(self, settings, monkeypatch, country_data):
+        settings.NEWSAPI_KEY = "test-key"
+        calls = []
+
+        def fake_everything(client, params, timeout=None):
+            calls.append(params)
+            return ok_response([make_article(f"https://example.com/{len(calls)}")])
+
+        monkeypatch.setattr(NewsAPIClient, "everything", fake_everything)
+
+        urls = fetch_urls(Command(), country_data, concurrency=1, budget=RequestBudget(2))
+
+        assert len(calls) == 2
+        assert len(urls) == 2
+
+    def test_consumer_can_stop_early(self, settings, monkeypatch):
+        settings.NEWSAPI_KEY = "test-key"
+        country_data = {
+            "nz": {"users": [1], "sources": ["bbc-news"], "keyword_batches": [[f"car{i}"] for i in range(40)]},
+        }
+        calls = []
+
+        def fake_everything(client, params, timeout=None):
+            calls.append(params)
+            articles = [make_article(f"https://example.com/{params['q']}/{params['page']}/{i}") for i in range(100)]
+            return FakeResponse({"status": "ok", "totalResults": 10000, "articles": articles})
+
+        monkeypatch.setattr(NewsAPIClient, "everything", fake_everything)
+        pages = Command().iter_article_pages(country_data, 3, {})
+
+        next(pages)
+        pages.close()
+
+        # The first page of each running query, and at most one more page of the query that was read
+        assert len(calls) <= 4
+
+    def test_missing_api_key_skips_fetch(self, settings, country_data):
+        settings.NEWSAPI_KEY = None
+
+        assert fetch_urls(Command(), country_data, concurrency=4) == []
+
+
+@pytest.mark.django_db
+class TestHighWaterMarks:
+
+    def test_new_query_fetches_last_24_hours(self, settings, monkeypatch, country_data):
+        settings.NEWSAPI_KEY = "test-key"
+        calls = []
+
+        def fake_everything(client, params, timeout=None):
+            calls.append(params)
+            return ok_response([make_article("https://example.com/nz")])
+
+        monkeypatch.setattr(NewsAPIClient, "everything", fake_everything)
+        high_water_marks = {}
+
+        fetch_urls(Command(), country_data, concurrency=1, high_water_marks=high_water_marks)
+
+        from_time = parse_datetime(calls[0]["from"] + "Z")
+        assert timedelta(hours=23) < timezone.now() - from_time < timedelta(hours=25)
+        assert len(high_water_marks) == 3
+        assert {country for country, *_ in high_water_marks.values()} == {"nz", "us"}
+
+    def test_query_resumes_from_newest_seen_article(self, settings, monkeypatch, country_data):
+        settings.NEWSAPI_KEY = "test-key"
+        calls = []
+
+        def fake_everything(client, params, timeout=None):
+            calls.append(params)
+            article = make_article(f"https://example.com/{params['sources']}/{params['q']}")
+            article["publishedAt"] = "2025-01-01T12:30:00Z"
+            return ok_response([article])
+
+        monkeypatch.setattr(NewsAPIClient, "everything", fake_everything)
+        command = Command()
+
+        high_water_marks = {}
+        fetch_urls(command, country_data, concurrency=1, high_water_marks=high_water_marks)
+        command.save_high_water_marks(high_water_marks)
+        calls.clear()
+        high_water_marks = {}
+        fetch_urls(command, country_data, concurrency=1, high_water_marks=high_water_marks)
+
+        assert FetchCursor.objects.count() == 3
+        assert [params["from"] for params in calls] == ["2025-01-01T12:30:00"] * 3
+        assert high_water_marks == {}
+
+    @pytest.fixture
+    def backlog(self, settings, monkeypatch):
+        """
+        Serves a single query with ``count`` new articles, one a minute, newest first and filtered by from/to like
+        NewsAPI does. Returns the country data of the query and the articles.
+        """
+        settings.NEWSAPI_KEY = "test-key"
+
+        def make_backlog(count):
+            newest = timezone.now().replace(microsecond=0) - timedelta(minutes=5)
+            articles = []
+            for i in range(count):
+                article = make_article(f"https://example.com/{i}")
+                article["publishedAt"] = (newest - timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+                articles.append(article)
+
+            def fake_everything(client, params, timeout=None):
+                from_time, to_time = parse_datetime(params["from"] + "Z"), parse_datetime(params["to"] + "Z")
+                matching = [a for a in articles if from_time <= parse_datetime(a["publishedAt"]) <= to_time]
+                start = (params["page"] - 1) * params["pageSize"]
+                page = matching[start:start + params["pageSize"]]
+                return FakeResponse({"status": "ok", "totalResults": len(matching), "articles": page})
+
+            monkeypatch.setattr(NewsAPIClient, "everything", fake_everything)
+            return {"nz": {"users": [1], "sources": ["bbc-news"], "keyword_batches": [["car"]]}}, articles
+
+        return make_backlog
+
+    def run_and_save(self, command, country_data, budget=None):
+        high_water_marks = {}
+        urls = fetch_urls(command, country_data, concurrency=1, high_water_marks=high_water_marks, budget=budget)
+        command.save_high_water_marks(high_water_marks)
+        return set(urls)
+
+    def test_run_cut_short_by_page_limit_resumes_below_oldest_article(self, settings, backlog):
+        settings.NEWSAPI_MAX_PAGES = 1
+        country_data, articles = backlog(250)
+        command = Command()
+
+        first = self.run_and_save(command, country_data)
+        cursor = FetchCursor.objects.get()
+        assert len(first) == 100
+        assert cursor.resume_before == parse_datetime(articles[99]["publishedAt"])
+        second = self.run_and_save(command, country_data)
+        third = self.run_and_save(command, country_data)
+
+        assert first | second | third == {article["url"] for article in articles}
+        cursor.refresh_from_db()
+        assert cursor.resume_before is None
+        assert cursor.newest_published_at == parse_datetime(articles[0]["publishedAt"])
+
+    def test_budget_stop_defers_the_rest_to_the_next_run(self, backlog):
+        country_data, articles = backlog(150)
+        command = Command()
+
+        first = self.run_and_save(command, country_data, budget=RequestBudget(1))
+        second = self.run_and_save(command, country_data, budget=RequestBudget(1))
+
+        assert len(first) == 100
+        assert first | second == {article["url"] for article in articles}
+        assert FetchCursor.objects.get().resume_before is None
+
+    def test_filled_gap_resumes_from_newest_ingested_article(self, monkeypatch, backlog):
+        country_data, articles = backlog(150)
+        command = Command()
+        self.run_and_save(command, country_data, budget=RequestBudget(1))
+        self.run_and_save(command, country_data, budget=RequestBudget(1))
+        calls = []
+        serve = NewsAPIClient.everything
+
+        def fake_everything(client, params, timeout=None):
+            calls.append(params)
+            return serve(client, params, timeout)
+
+        monkeypatch.setattr(NewsAPIClient, "everything", fake_everything)
+
+        self.run_and_save(command, country_data)
+
+        assert [params["from"] + "Z" for params in calls] == [articles[0]["publishedAt"]]
+        assert FetchCursor.objects.get().newest_published_at == parse_datetime(articles[0]["publishedAt"])
+
+    def test_stops_paging_at_a_page_of_stored_articles(self, monkeypatch, backlog):
+        country_data, articles = backlog(300)
+        Article.objects.bulk_create(
+            Article(title="Stored", article_url=article["url"], published_at=parse_datetime(article["publishedAt"]))
+            for article in articles[:100]
+        )
+        calls = []
+        serve = NewsAPIClient.everything
+
+        def fake_everything(client, params, timeout=None):
+            calls.append(params)
+            return serve(client, params, timeout)
+
+        monkeypatch.setattr(NewsAPIClient, "everything", fake_everything)
+
+        assert self.run_and_save(Command(), country_data) == set()
+
+        assert len(calls) == 1
+        assert FetchCursor.objects.get().newest_published_at == parse_datetime(articles[0]["publishedAt"])
+
+    def test_budget_stop_before_any_request_leaves_cursor(self, backlog):
+        country_data, _ = backlog(150)
+        command = Command()
+        self.run_and_save(command, country_data, budget=RequestBudget(1))
+        cursor = FetchCursor.objects.values_list("newest_published_at", "resume_before", "updated_at").get()
+
+        assert self.run_and_save(command, country_data, budget=RequestBudget(0)) == set()
+        assert FetchCursor.objects.values_list("newest_published_at", "resume_before", "updated_at").get() == cursor
+
+    def test_keyword_batches_are_stable(self):
+        command = Command()
+
+        assert command.create_keyword_batches(["ev", "car", "automobile"]) == [["automobile", "car", "ev"]]
+
+
+@pytest.mark.django_db
+class TestOrganizeByCountry:
+
+    def test_groups_users_sources_and_keywords_by_country(self, user, country, source):
+        local = Source.objects.create(api_id='nz-herald', name='NZ Herald', country=country)
+        user.preferences.preferred_countries.add(country)
+        user.preferences.preferred_sources.add(source, local)
+        User.objects.create_user(username='nowhere', password='pass')
+        command = Command()
+
+        country_data = command.organize_by_country(command.get_routing_snapshot())
+
+        assert country_data == {
+            "nz": {"users": [user.id], "sources": ["nz-herald"], "keyword_batches": [["automobile", "car"]]},
+        }
+
+
+@pytest.mark.django_db
+class TestProcessAndLinkArticles:
+
+    def test_creates_new_articles_and_links_matching_users(self, user, source):
+        existing = Article.objects.create(
+            title='Old car story',
+            article_url='https://example.com/existing',
+            published_at=timezone.now(),
+        )
+        articles_data = [
+            make_article('https://example.com/existing', title='Updated car story'),
+            make_article('https://example.com/new', title='New car story'),
+            make_article('https://example.com/new', title='Duplicate car story'),
+            make_article('https://example.com/boats', title='Boats only', description='Sailing'),
+            {"url": "https://example.com/no-date", "title": "Car without date"},
+        ]
+        command = Command()
+
+        command.process_and_link_articles([articles_data], command.get_routing_snapshot())
+
+        assert Article.objects.count() == 3
+        existing.refresh_from_db()
+        assert existing.title == 'Old car story'
+        new_article = Article.objects.get(article_url='https://example.com/new')
+        assert new_article.title == 'New car story'
+        assert new_article.source == source
+        linked_urls = set(
+            UserArticle.objects.filter(user=user).values_list('article__article_url', flat=True)
+        )
+        assert linked_urls == {'https://example.com/existing', 'https://example.com/new'}
+        assert not UserArticle.objects.exclude(published_at=F('article__published_at')).exists()
+
+    def test_query_count_does_not_grow_with_articles(self, user, source, django_assert_max_num_queries):
+        articles_data = [make_article(f'https://example.com/car-{i}') for i in range(50)]
+        command = Command()
+        snapshot = command.get_routing_snapshot()
+
+        with django_assert_max_num_queries(10):
+            summary = command.process_and_link_articles([articles_data], snapshot)
+
+        assert Article.objects.count() == 50
+        assert UserArticle.objects.filter(user=user).count() == 50
+        assert summary["new_links"] == 50
+        assert set(summary["stages"]) == {"parse", "sources", "articles", "links"}
+
+    def test_bumps_feed_version_of_linked_users_only(self, user, source):
+        other = User.objects.create_user(username='boats', password='pass')
+        other.preferences.keywords = ['boat']
+        other.preferences.save()
+        versions = {user.id: get_feed_version(user.id), other.id: get_feed_version(other.id)}
+        command = Command()
+
+        command.process_and_link_articles([[make_article('https://example.com/car')]], command.get_routing_snapshot())
+
+        assert get_feed_version(user.id) != versions[user.id]
+        assert get_feed_version(other.id) == versions[other.id]
+
+    def test_existing_links_are_not_counted_or_bumped(self, user, source):
+        command = Command()
+        command.process_and_link_articles([[make_article('https://example.com/car')]], command.get_routing_snapshot())
+        version = get_feed_version(user.id)
+
+        summary = command.process_and_link_articles(
+            [[make_article('https://example.com/car')]], command.get_routing_snapshot()
+        )
+
+        assert summary["new_links"] == 0
+        assert get_feed_version(user.id) == version
+
+    def test_pages_are_deduplicated_and_ingested_in_batches(self, user, source):
+        pages = [
+            [make_article(f'https://example.com/car-{i}') for i in range(0, 6)],
+            [make_article(f'https://example.com/car-{i}') for i in range(4, 10)],
+        ]
+        command = Command()
+
+        summary = command.process_and_link_articles(iter(pages), command.get_routing_snapshot(), batch_size=3)
+
+        assert summary["articles"] == 10
+        assert summary["new_articles"] == 10
+        assert Article.objects.count() == 10
+        assert UserArticle.objects.filter(user=user).count() == 10
+
+
+@pytest.mark.django_db
+class TestShards:
+
+    @pytest.fixture
+    def readers(self, user, country, source):
+        us = Country.objects.create(name='United States', code='us')
+        user.preferences.preferred_countries.add(country, us)
+        user.preferences.preferred_sources.add(
+            Source.objects.create(api_id='nz-herald', name='NZ Herald', country=country),
+            Source.objects.create(api_id='cnn', name='CNN', country=us),
+        )
+
+    def test_lock_excludes_second_holder(self):
+        with advisory_lock("fetch_news:nz") as acquired:
+            with advisory_lock("fetch_news:nz") as acquired_again:
+                assert acquired and not acquired_again
+        with advisory_lock("fetch_news:nz") as acquired:
+            assert acquired
+
+    def test_runs_only_its_country(self, settings, monkeypatch, readers):
+        settings.NEWSAPI_KEY = "test-key"
+        calls = []
+
+        def fake_everything(client, params, timeout=None):
+            calls.append(params["sources"])
+            return ok_response([make_article(f"https://example.com/{params['sources']}")])
+
+        monkeypatch.setattr(NewsAPIClient, "everything", fake_everything)
+
+        summary = Command().run(country_code="NZ")
+
+        assert calls == ["nz-herald"]
+        assert summary["countries"] == ["nz"]
+        assert summary["requests"] == 1
+
+    def test_skips_country_locked_by_another_worker(self, settings, monkeypatch, readers):
+        settings.NEWSAPI_KEY = "test-key"
+        calls = []
+
+        def fake_everything(client, params, timeout=None):
+            calls.append(params["sources"])
+            return ok_response([])
+
+        monkeypatch.setattr(NewsAPIClient, "everything", fake_everything)
+
+        with advisory_lock("fetch_news:nz"):
+            summary = Command().run()
+
+        assert calls == ["cnn"]
+        assert summary["status"] == "done"
+        assert summary["countries"] == ["us"]
+        assert summary["locked"] == ["nz"]
+
+    def test_shard_reports_locked_country(self, settings, monkeypatch, readers):
+        settings.NEWSAPI_KEY = "test-key"
+        monkeypatch.setattr(NewsAPIClient, "everything", lambda client, params, timeout=None: ok_response([]))
+
+        with advisory_lock("fetch_news:nz"):
+            fetch_news_shard_task.now("cycle", "nz")
+
+        assert cache.get(shard_result_key("cycle", "nz"))["status"] == "locked"
+
+    def test_shard_without_sources_or_keywords_is_empty_not_locked(self, settings, readers):
+        settings.NEWSAPI_KEY = "test-key"
+        Country.objects.create(name='France', code='fr')
+
+        fetch_news_shard_task.now("cycle", "fr")
+
+        assert cache.get(shard_result_key("cycle", "fr"))["status"] == "empty"
+
+    def test_log_sink_is_added_once_per_process(self, monkeypatch):
+        added = []
+        monkeypatch.setattr(fetch_news, "_log_sink_id", None)
+        monkeypatch.setattr(fetch_news.logger, "add", lambda *args, **kwargs: added.append(args) or len(added))
+
+        Command()
+        Command()
+
+        assert added == [(fetch_news.LOG_FILE,)]
+
+    def test_coordinator_schedules_a_shard_per_country_and_reports_timings(self, settings, monkeypatch, readers):
+        settings.NEWSAPI_KEY = "test-key"
+        settings.NEWSAPI_REQUEST_BUDGET = 10
+        monkeypatch.setattr(NewsAPIClient, "everything", lambda client, params, timeout=None: ok_response([]))
+
+        fetch_news_task.now()
+
+        tasks = Task.objects.filter(task_name="tasks.fetch_news_task.fetch_news_shard_task")
+        shards = sorted(task.params()[0] for task in tasks)
+        cycle = cache.get(CYCLE_KEY)
+        assert [args[1] for args in shards] == ["nz", "us"]
+        assert all(args[0] == cycle["id"] and args[2] == 5 for args in shards)
+
+        fetch_news_shard_task.now(*shards[0])
+        report = report_cycle(cycle)
+
+        assert report["nz"]["status"] == "done"
+        assert report["nz"]["elapsed"] >= 0
+        assert report["us"] is None
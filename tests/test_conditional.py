@@ -0,0 +1,126 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from api.models import Article, Source, UserArticle
+from api.refdata import get_reference_data
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def client(api_client, user_token):
+    api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+    return api_client
+
+
+def revalidate(client, url, response, **params):
+    return client.get(url, params, HTTP_IF_NONE_MATCH=response['ETag'])
+
+
+class TestReferenceDataConditional:
+
+    def test_matching_etag_is_not_modified(self, client, country, source, django_assert_num_queries):
+        url = reverse('source-list')
+        response = client.get(url)
+        get_reference_data()
+
+        # The token is cached by the first request
+        with django_assert_num_queries(0):
+            revalidated = revalidate(client, url, response)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+        assert revalidated['ETag'] == response['ETag']
+        assert 'Last-Modified' in response
+
+    def test_source_change_updates_etag(self, client, source):
+        url = reverse('source-list')
+        response = client.get(url)
+
+        source.name = 'BBC World'
+        source.save()
+
+        assert revalidate(client, url, response).status_code == status.HTTP_200_OK
+
+    def test_etag_depends_on_parameters(self, client, country, source):
+        url = reverse('source-list')
+
+        response = client.get(url)
+
+        assert client.get(url, {'country_id': str(country.id)})['ETag'] != response['ETag']
+        assert client.get(reverse('country-list'))['ETag'] != response['ETag']
+
+
+class TestArticleListConditional:
+
+    def test_matching_etag_is_not_modified(self, client, articles, django_assert_num_queries):
+        url = reverse('article-list')
+        response = client.get(url)
+
+        # Only MAX(fetched_at), no page or count query
+        with django_assert_num_queries(1):
+            revalidated = revalidate(client, url, response)
+
+        assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_new_article_updates_etag(self, client, articles):
+        url = reverse('article-list')
+        response = client.get(url)
+
+        Article.objects.create(
+            title='Breaking', source_name='Test Source', article_url='https://example.com/breaking',
+            published_at=timezone.now(),
+        )
+
+        assert revalidate(client, url, response).status_code == status.HTTP_200_OK
+
+    def test_source_change_updates_etag(self, client, articles):
+        url = reverse('article-list')
+        response = client.get(url)
+
+        Source.objects.create(api_id='cnn', name='CNN')
+
+        assert revalidate(client, url, response).status_code == status.HTTP_200_OK
+
+
+class TestPersonalizedFeedConditional:
+
+    def test_matching_etag_is_not_modified(self, client, user, articles, django_assert_num_queries):
+        UserArticle.objects.create(user=user, article=articles[0])
+        url = reverse('article-personalized-feed')
+        response = client.get(url)
+
+        # The token is cached by the first request
+        with django_assert_num_queries(0):
+            revalidated = revalidate(client, url, response)
+
+        assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_new_link_updates_etag(self, client, user, articles):
+        UserArticle.objects.create(user=user, article=articles[1])
+        url = reverse('article-personalized-feed')
+        response = client.get(url)
+
+        UserArticle.objects.create(user=user, article=articles[0])
+
+        revalidated = revalidate(client, url, response)
+        assert revalidated.status_code == status.HTTP_200_OK
+        assert revalidated.data['count'] == 2
+
+    def test_etag_is_per_user(self, client, user, admin_token, articles):
+        url = reverse('article-personalized-feed')
+        response = client.get(url)
+
+        client.credentials(HTTP_AUTHORIZATION=f'Token {admin_token.key}')
+
+        assert revalidate(client, url, response).status_code == status.HTTP_200_OK
+
+    def test_if_modified_since_without_etag(self, client, user, articles):
+        url = reverse('article-personalized-feed')
+        response = client.get(url)
+
+        revalidated = client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+        assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
@@ -0,0 +1,117 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.filters import ArticleFilter, PersonalizedFeedFilter
+from api.models import Article, Source, UserArticle
+from api.views import ArticleViewSet, get_feed_queryset
+
+pytestmark = pytest.mark.django_db
+
+
+def explain(queryset):
+    """
+    Returns the query plan. With the few rows a test seeds PostgreSQL rightly prefers a sequential scan over any
+    index, so sequential scans are disabled: the plan then only falls back to one when no index can serve the query.
+    """
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+
+def assert_no_full_scan(plan, table="api_article"):
+    if connection.vendor == "postgresql":
+        assert f"Seq Scan on {table}" not in plan, plan
+    else:
+        full_scans = [line for line in plan.splitlines() if re.search(rf"\bSCAN {table}\b(?! USING)", line)]
+        assert not full_scans, plan
+
+
+@pytest.fixture
+def feed_articles(user):
+    source = Source.objects.create(api_id="bbc-news", name="BBC News")
+    now = timezone.now()
+    articles = Article.objects.bulk_create(
+        Article(
+            title=f"Article {i}",
+            source=source,
+            source_name=source.name,
+            article_url=f"https://example.com/indexed-{i}",
+            published_at=now - timedelta(hours=i),
+        )
+        for i in range(50)
+    )
+    UserArticle.objects.bulk_create(
+        UserArticle(user=user, article=article, published_at=article.published_at) for article in articles[::2]
+    )
+    return articles
+
+
+def article_list_queryset(user, params=None):
+    request = Request(APIRequestFactory().get("/api/articles/", params))
+    request.user = user
+    view = ArticleViewSet(request=request, action="list", format_kwarg=None, args=(), kwargs={})
+    return view.get_list_queryset()
+
+
+class TestArticleIndexes:
+
+    def test_article_list_uses_published_index(self, user, feed_articles):
+        plan = explain(article_list_queryset(user)[:20])
+
+        assert_no_full_scan(plan)
+        assert "Sort" not in plan and "TEMP B-TREE" not in plan, plan
+
+    def test_personalized_feed_uses_indexes(self, user, feed_articles):
+        request = APIRequestFactory().get("/api/articles/personalized-feed/")
+        plan = explain(get_feed_queryset(request, user)[:20])
+
+        assert_no_full_scan(plan)
+        assert_no_full_scan(plan, table="api_userarticle")
+        assert "api_userarticle_feed_idx" in plan, plan
+        assert "Sort" not in plan and "TEMP B-TREE" not in plan, plan
+
+    def test_fetched_at_range_uses_index(self, feed_articles):
+        queryset = Article.objects.filter(fetched_at__gte=timezone.now() - timedelta(days=1))
+
+        assert_no_full_scan(explain(queryset))
+
+    def test_published_date_filter_uses_index(self, feed_articles):
+        filterset = ArticleFilter({"published_at": timezone.localdate().isoformat()}, queryset=Article.objects.all())
+
+        assert filterset.is_valid()
+        assert_no_full_scan(explain(filterset.qs))
+
+    def test_published_date_filter_matches_whole_day(self, feed_articles):
+        day = timezone.localdate(feed_articles[0].published_at)
+        filterset = ArticleFilter({"published_at": day.isoformat()}, queryset=Article.objects.all())
+
+        expected = {a.id for a in feed_articles if timezone.localdate(a.published_at) == day}
+        assert set(filterset.qs.values_list("id", flat=True)) == expected
+
+    def test_keyword_filter_uses_search_index(self, user, feed_articles):
+        if connection.vendor != "postgresql":
+            pytest.skip("The search_vector column only exists on PostgreSQL")
+        filterset = PersonalizedFeedFilter({"keywords": "car, article"}, queryset=Article.objects.all())
+
+        assert filterset.is_valid()
+        plan = explain(filterset.qs)
+        assert_no_full_scan(plan)
+        assert "api_article_search_idx" in plan, plan
+
+    @pytest.mark.parametrize("field", ["source_name", "title"])
+    def test_icontains_uses_trigram_index(self, feed_articles, field):
+        if connection.vendor != "postgresql":
+            pytest.skip("pg_trgm indexes only exist on PostgreSQL")
+        queryset = Article.objects.filter(**{f"{field}__icontains": "bbc"})
+
+        plan = explain(queryset)
+        assert_no_full_scan(plan)
+        assert f"api_article_{field}_trgm" in plan, plan
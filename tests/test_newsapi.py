@@ -0,0 +1,145 @@
+import pytest
+from django.utils.dateparse import parse_datetime
+
+from api.newsapi import NewsAPIClient, NewsAPIError, RequestBudget, get_client
+
+
+class TestNewsAPIClient:
+
+    def test_get_client_is_shared(self):
+        assert get_client() is get_client()
+
+    def test_get_client_rebuilt_when_settings_change(self, settings):
+        client = get_client()
+        settings.NEWSAPI_BASE_URL = "http://localhost:9999/v2"
+
+        rebuilt = get_client()
+
+        assert rebuilt is not client
+        assert rebuilt.base_url == "http://localhost:9999/v2"
+
+    def test_session_pool_and_retry_policy(self, settings):
+        settings.NEWSAPI_POOL_SIZE = 16
+        settings.NEWSAPI_MAX_RETRIES = 5
+
+        adapter = NewsAPIClient().session.get_adapter("https://newsapi.org/v2/everything")
+
+        assert adapter._pool_maxsize == 16
+        assert adapter.max_retries.total == 5
+        assert 429 in adapter.max_retries.status_forcelist
+        assert 503 in adapter.max_retries.status_forcelist
+
+    def test_request_adds_api_key_and_timeout(self, settings, monkeypatch):
+        settings.NEWSAPI_KEY = "test-key"
+        settings.NEWSAPI_TIMEOUT = 12
+        client = NewsAPIClient(base_url="https://newsapi.org/v2")
+        captured = {}
+
+        def fake_get(url, params=None, timeout=None):
+            captured.update(url=url, params=params, timeout=timeout)
+
+        monkeypatch.setattr(client.session, "get", fake_get)
+
+        client.everything({"q": "car"})
+
+        assert captured == {
+            "url": "https://newsapi.org/v2/everything",
+            "params": {"apiKey": "test-key", "q": "car"},
+            "timeout": 12,
+        }
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def make_page(start, count, total, published_at="2025-01-01T10:00:00Z"):
+    articles = [
+        {"url": f"https://example.com/{i}", "publishedAt": published_at} for i in range(start, start + count)
+    ]
+    return FakeResponse({"status": "ok", "totalResults": total, "articles": articles})
+
+
+class TestIterEverything:
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        client = NewsAPIClient(base_url="https://newsapi.org/v2", api_key="test-key")
+        client.calls = []
+        client.responses = []
+
+        def fake_everything(params, timeout=None):
+            client.calls.append(params)
+            return client.responses.pop(0)
+
+        monkeypatch.setattr(client, "everything", fake_everything)
+        return client
+
+    def test_walks_pages_until_total_results(self, client):
+        client.responses = [make_page(0, 100, 250), make_page(100, 100, 250), make_page(200, 50, 250)]
+
+        pages = list(client.iter_everything({"q": "car"}))
+
+        assert [len(page) for page in pages] == [100, 100, 50]
+        assert [params["page"] for params in client.calls] == [1, 2, 3]
+
+    def test_is_lazy(self, client):
+        client.responses = [make_page(0, 100, 250), make_page(100, 100, 250)]
+
+        next(client.iter_everything({"q": "car"}))
+
+        assert len(client.calls) == 1
+
+    def test_stops_at_articles_older_than_high_water_mark(self, client):
+        page = make_page(0, 100, 500)
+        page.payload["articles"][60]["publishedAt"] = "2024-12-31T23:00:00Z"
+        client.responses = [page]
+
+        pages = list(client.iter_everything({"q": "car"}, stop_before=parse_datetime("2025-01-01T00:00:00Z")))
+
+        assert [len(page) for page in pages] == [60]
+        assert len(client.calls) == 1
+
+    def test_respects_budget_and_max_pages(self, client):
+        client.responses = [make_page(0, 100, 500) for _ in range(5)]
+        budget = RequestBudget(2)
+
+        assert len(list(client.iter_everything({"q": "car"}, budget=budget))) == 2
+        assert budget.exhausted
+        client.calls.clear()
+        assert len(list(client.iter_everything({"q": "car"}, max_pages=1))) == 1
+
+    def test_reports_whether_paging_completed(self, client):
+        def run(pages):
+            try:
+                while True:
+                    next(pages)
+            except StopIteration as done:
+                return done.value
+
+        client.responses = [make_page(0, 100, 150), make_page(100, 50, 150)]
+        assert run(client.iter_everything({"q": "car"})) is True
+        client.responses = [make_page(0, 100, 150)]
+        assert run(client.iter_everything({"q": "car"}, max_pages=1)) is False
+        assert run(client.iter_everything({"q": "car"}, budget=RequestBudget(0))) is False
+
+    def test_maximum_results_reached_ends_paging(self, client):
+        client.responses = [
+            make_page(0, 100, 500),
+            FakeResponse({"status": "error", "code": "maximumResultsReached", "message": "Upgrade"}),
+        ]
+
+        assert len(list(client.iter_everything({"q": "car"}))) == 1
+
+    def test_other_errors_are_raised(self, client):
+        client.responses = [FakeResponse({"status": "error", "code": "apiKeyInvalid", "message": "Bad key"})]
+
+        with pytest.raises(NewsAPIError):
+            list(client.iter_everything({"q": "car"}))
@@ -0,0 +1,108 @@
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from api import refdata
+from api.models import Source
+from api.refdata import bump_reference_data_version, defer_reference_data_bump, get_reference_data
+from api.serializers import SourceSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def sources(country):
+    return [
+        Source.objects.create(api_id='nz-herald', name='NZ Herald', country=country),
+        Source.objects.create(api_id='reuters', name='Reuters'),
+    ]
+
+
+class TestReferenceData:
+
+    def test_loads_both_tables_once(self, sources, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            reference_data = get_reference_data()
+        with django_assert_num_queries(0):
+            assert get_reference_data() is reference_data
+
+        assert reference_data.source_ids_by_api_id == {'nz-herald': sources[0].id, 'reuters': sources[1].id}
+        assert reference_data.sources_by_id[sources[0].id] == SourceSerializer(sources[0]).data
+
+    def test_reloads_after_bump(self, sources):
+        reference_data = get_reference_data()
+
+        bump_reference_data_version()
+
+        assert get_reference_data() is not reference_data
+
+    def test_reloads_when_older_than_max_age(self, settings, sources):
+        reference_data = get_reference_data()
+
+        settings.REFDATA_MAX_AGE = 0
+
+        assert get_reference_data() is not reference_data
+
+    def test_model_changes_invalidate(self, country, sources):
+        get_reference_data()
+
+        Source.objects.create(api_id='cnn', name='CNN', country=country)
+        country.name = 'Aotearoa'
+        country.save()
+
+        reference_data = get_reference_data()
+        assert 'cnn' in reference_data.source_ids_by_api_id
+        assert reference_data.countries_by_id[country.id]['name'] == 'Aotearoa'
+
+
+    def test_bulk_load_bumps_version_once(self, monkeypatch, country):
+        spy = mock.Mock(wraps=refdata.cache)
+        monkeypatch.setattr(refdata, 'cache', spy)
+
+        call_command('populate_countries')
+
+        assert spy.set.call_count == 1
+
+    def test_deferred_bump_still_invalidates(self, country, sources):
+        reference_data = get_reference_data()
+
+        with defer_reference_data_bump():
+            Source.objects.create(api_id='cnn', name='CNN', country=country)
+            assert get_reference_data() is reference_data
+
+        assert 'cnn' in get_reference_data().source_ids_by_api_id
+
+
+class TestReferenceDataEndpoints:
+
+    def test_lists_are_served_from_cache(self, api_client, user_token, country, sources, django_assert_num_queries):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+        get_reference_data()
+
+        # Only the token lookup, which is cached for the following requests
+        with django_assert_num_queries(1):
+            countries = api_client.get(reverse('country-list'))
+        with django_assert_num_queries(0):
+            filtered = api_client.get(reverse('source-list'), {'country_id': str(country.id)})
+        with django_assert_num_queries(0):
+            detail = api_client.get(reverse('source-detail', kwargs={'pk': sources[1].pk}))
+
+        assert [row['code'] for row in countries.data] == ['nz']
+        assert [row['api_id'] for row in filtered.data] == ['nz-herald']
+        assert detail.data['api_id'] == 'reuters'
+
+    def test_other_parameters_use_database(self, api_client, user_token, sources):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+
+        response = api_client.get(reverse('source-list'), {'ids': str(sources[1].id)})
+
+        assert [row['api_id'] for row in response.data] == ['reuters']
+
+    def test_unknown_id_is_not_found(self, api_client, user_token, country):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+
+        response = api_client.get(reverse('country-detail', kwargs={'pk': country.pk + 100}))
+
+        assert response.status_code == 404
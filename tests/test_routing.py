@@ -0,0 +1,126 @@
+import random
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from api.models import Source
+from api.routing import KeywordMatcher, RoutingIndex, RoutingSnapshot
+
+User = get_user_model()
+
+
+class TestKeywordMatcher:
+
+    def test_matches_overlapping_keywords(self):
+        matcher = KeywordMatcher(["he", "she", "his", "hers"])
+
+        assert matcher.match("ushers") == {0, 1, 3}
+
+    def test_no_match(self):
+        matcher = KeywordMatcher(["car", "automobile"])
+
+        assert matcher.match("boats and planes") == set()
+        assert matcher.match("") == set()
+
+    def test_ignores_empty_keywords(self):
+        matcher = KeywordMatcher(["", "car"])
+
+        assert matcher.match("a car") == {1}
+
+    def test_multi_word_keywords(self):
+        matcher = KeywordMatcher(["electric car", "car"])
+
+        assert matcher.match("new electric car launched") == {0, 1}
+
+    def test_same_result_as_substring_checks(self):
+        rng = random.Random(7)
+        keywords = list({"".join(rng.choices("abcd", k=rng.randint(1, 5))) for _ in range(200)})
+        matcher = KeywordMatcher(keywords)
+
+        for _ in range(50):
+            text = "".join(rng.choices("abcd ", k=80))
+            expected = {i for i, keyword in enumerate(keywords) if keyword in text}
+            assert matcher.match(text) == expected
+
+
+def match_with_sets(users, source_api_id, text):
+    matched = set()
+    for user_id, source_api_ids, keywords in users:
+        keywords = [kw.lower().strip() for kw in keywords if kw.strip()]
+        source_match = not source_api_ids or (source_api_id and source_api_id in source_api_ids)
+        keyword_match = not keywords or any(keyword in text for keyword in keywords)
+        if source_match and keyword_match:
+            matched.add(user_id)
+    return matched
+
+
+class TestRoutingIndex:
+
+    def test_source_and_keyword_preferences(self):
+        users = [
+            (1, ["bbc-news"], ["car"]),
+            (2, ["cnn"], ["car"]),
+            (3, [], ["boat"]),
+            (4, ["bbc-news"], []),
+            (5, [], []),
+        ]
+        routing = RoutingIndex(users)
+
+        assert set(routing.match("bbc-news", "new car model")) == {1, 4, 5}
+        assert set(routing.match("cnn", "a boat race")) == {3, 5}
+        assert set(routing.match(None, "car and boat")) == {3, 5}
+        assert set(routing.match("unknown", "nothing relevant")) == {5}
+
+    def test_empty_index(self):
+        assert RoutingIndex([]).match("bbc-news", "car") == []
+
+    def test_same_result_as_set_algebra(self):
+        rng = random.Random(3)
+        sources = ["bbc-news", "cnn", "abc-news", "reuters"]
+        vocabulary = ["car", "automobile", "ev", "truck", "boat", "bike", "race", "engine"]
+        users = [
+            (
+                user_id,
+                rng.sample(sources, rng.randint(0, 2)),
+                # A few very common keywords become dense bitmaps, the rest stay sparse
+                rng.sample(vocabulary[:2], 1) if rng.random() < 0.5 else rng.sample(vocabulary, rng.randint(0, 2)),
+            )
+            for user_id in range(1000, 1500)
+        ]
+        routing = RoutingIndex(users)
+
+        for _ in range(100):
+            source_api_id = rng.choice(sources + [None])
+            text = " ".join(rng.sample(vocabulary + ["news", "today"], 3))
+            assert set(routing.match(source_api_id, text)) == match_with_sets(users, source_api_id, text)
+
+
+@pytest.mark.django_db
+class TestRoutingSnapshot:
+
+    def test_reads_preferences_in_three_queries(self, country, source, django_assert_num_queries):
+        local = Source.objects.create(api_id='nz-herald', name='NZ Herald', country=country)
+        for i in range(5):
+            preferences = User.objects.create_user(username=f'reader{i}', password='pass').preferences
+            preferences.keywords = [f'kw{i}']
+            preferences.save()
+            preferences.preferred_countries.add(country)
+            preferences.preferred_sources.add(source, local)
+
+        with django_assert_num_queries(3):
+            snapshot = RoutingSnapshot.load()
+
+        assert len(snapshot.users) == 5
+        user = snapshot.users[0]
+        assert user.username == 'reader0'
+        assert user.countries == [(country.id, 'nz')]
+        assert sorted(user.sources) == [('bbc-news', None), ('nz-herald', country.id)]
+        assert user.keywords == ['kw0']
+
+    def test_feeds_routing_index(self, user, source):
+        user.preferences.preferred_sources.add(source)
+
+        routing = RoutingIndex(RoutingSnapshot.load().routing_users())
+
+        assert routing.match('bbc-news', 'new car model') == [user.id]
+        assert routing.match('cnn', 'new car model') == []
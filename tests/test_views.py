@@ -1,11 +1,16 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from datetime import timedelta
 from django.utils import timezone
 
 from api.models import Country, Source, UserPreference, Article, UserArticle
+from api.serializers import ArticleListSerializer, ArticleSerializer
+from api.refdata import get_reference_data
+from api.utils import assert_queries_do_not_grow
 
 User = get_user_model()
 
@@ -256,7 +261,17 @@ class TestArticleViewSet:
         article_ids = [article['id'] for article in response.data['results']]
         assert articles[0].id in article_ids
         assert articles[1].id in article_ids
-    
+
+    def test_personalized_feed_newest_first(self, api_client, user, user_token, articles):
+        for article in reversed(articles):
+            user_article = UserArticle.objects.create(user=user, article=article)
+            assert user_article.published_at == article.published_at
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+        response = api_client.get(reverse('article-personalized-feed'))
+        assert response.status_code == status.HTTP_200_OK
+        assert [article['id'] for article in response.data['results']] == [article.id for article in articles]
+
     def test_personalized_feed_pagination(self, api_client, user, user_token):
         articles = []
         for i in range(25):
@@ -347,6 +362,307 @@ class TestArticlePagination:
         assert len(response.data['results']) == 30
 
 
+@pytest.mark.django_db
+class TestArticleCursorPagination:
+
+    @pytest.fixture
+    def many_articles(self):
+        # Pairs of articles share a publication time, so paging must break ties on id
+        now = timezone.now()
+        return [
+            Article.objects.create(
+                title=f'Article {i}',
+                article_url=f'https://example.com/cursor-{i}',
+                published_at=now - timedelta(hours=i // 2)
+            )
+            for i in range(25)
+        ]
+
+    def walk(self, api_client, url, params):
+        ids = []
+        response = api_client.get(url, params)
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            assert 'count' not in response.data
+            ids += [article['id'] for article in response.data['results']]
+            if not response.data['next']:
+                return ids, response
+            response = api_client.get(response.data['next'])
+
+    def test_walks_article_list_in_order(self, api_client, user_token, many_articles):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+
+        ids, _ = self.walk(api_client, reverse('article-list'), {'pagination': 'cursor', 'page_size': 10})
+
+        expected = Article.objects.order_by('-published_at', '-id').values_list('id', flat=True)
+        assert ids == list(expected)
+
+    def test_previous_link_returns_previous_page(self, api_client, user_token, many_articles):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+        url = reverse('article-list')
+
+        first = api_client.get(url, {'pagination': 'cursor', 'page_size': 10})
+        assert first.data['previous'] is None
+        second = api_client.get(first.data['next'])
+        previous = api_client.get(second.data['previous'])
+
+        assert previous.data['results'] == first.data['results']
+        assert previous.data['next'] == first.data['next']
+
+    def test_walks_personalized_feed(self, api_client, user, user_token, many_articles):
+        for article in many_articles[::2]:
+            UserArticle.objects.create(user=user, article=article)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+
+        ids, _ = self.walk(api_client, reverse('article-personalized-feed'), {'pagination': 'cursor', 'page_size': 5})
+
+        expected = sorted(many_articles[::2], key=lambda a: (a.published_at, a.id), reverse=True)
+        assert ids == [article.id for article in expected]
+
+    def test_no_count_query(self, api_client, user_token, many_articles, django_assert_num_queries):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+
+        # Token lookup, the MAX(fetched_at) validator and the page itself
+        with django_assert_num_queries(3) as captured:
+            response = api_client.get(reverse('article-list'), {'pagination': 'cursor'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not any('COUNT(' in query['sql'] for query in captured.captured_queries)
+
+    def test_invalid_cursor(self, api_client, user_token):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+
+        for cursor in ('not-a-cursor', 'eyJwIjogWyJnYXJiYWdlIiwgMV0sICJyIjogMH0'):
+            response = api_client.get(reverse('article-list'), {'cursor': cursor})
+
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestPersonalizedFeedSearch:
+
+    @pytest.fixture
+    def feed(self, user):
+        now = timezone.now()
+        articles = [
+            Article.objects.create(
+                title=title,
+                summary=summary,
+                article_url=f'https://example.com/search-{i}',
+                published_at=now - timedelta(hours=i)
+            )
+            for i, (title, summary) in enumerate([
+                ('Electric car sales climb', 'Battery prices fall'),
+                ('Boat show opens', 'Sailing season starts'),
+                ('Market update', 'New electric car models announced'),
+            ])
+        ]
+        for article in articles:
+            UserArticle.objects.create(user=user, article=article)
+        return articles
+
+    def get_titles(self, api_client, user_token, params):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+        response = api_client.get(reverse('article-personalized-feed'), params)
+        assert response.status_code == status.HTTP_200_OK
+        return [article['title'] for article in response.data['results']]
+
+    def test_search_matches_title_or_summary(self, api_client, user_token, feed):
+        titles = self.get_titles(api_client, user_token, {'search': 'electric car'})
+
+        assert set(titles) == {'Electric car sales climb', 'Market update'}
+
+    def test_search_keeps_feed_order(self, api_client, user, user_token, feed):
+        newest = Article.objects.create(
+            title='Weekend briefing',
+            summary='An electric ferry',
+            article_url='https://example.com/search-newest',
+            published_at=timezone.now() + timedelta(hours=1),
+        )
+        UserArticle.objects.create(user=user, article=newest)
+
+        for params in ({'search': 'electric'}, {'search': 'electric', 'pagination': 'cursor'}):
+            titles = self.get_titles(api_client, user_token, params)
+
+            assert titles == ['Weekend briefing', 'Electric car sales climb', 'Market update']
+
+    def test_article_list_search_ranks_title_matches_first(self, api_client, user_token, feed):
+        if connection.vendor != 'postgresql':
+            pytest.skip('Ranking needs the PostgreSQL search_vector column')
+        feed[0].published_at = timezone.now() - timedelta(days=1)
+        feed[0].save()
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+
+        response = api_client.get(reverse('article-list'), {'search': 'electric'})
+
+        titles = [article['title'] for article in response.data['results']]
+        assert titles == ['Electric car sales climb', 'Market update']
+
+    def test_article_list_search_rejects_cursor_pagination(self, api_client, user_token, feed):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+
+        response = api_client.get(reverse('article-list'), {'search': 'electric', 'pagination': 'cursor'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'search' in response.data
+
+    def test_keywords_match_any_and_keep_feed_order(self, api_client, user_token, feed):
+        titles = self.get_titles(api_client, user_token, {'keywords': 'sailing, electric car,'})
+
+        assert titles == ['Electric car sales climb', 'Boat show opens', 'Market update']
+
+
+@pytest.mark.django_db
+class TestPersonalizedFeedCache:
+
+    def test_repeated_request_is_served_from_cache(
+        self, api_client, user, user_token, articles, django_assert_num_queries
+    ):
+        UserArticle.objects.create(user=user, article=articles[0])
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+        url = reverse('article-personalized-feed')
+        first = api_client.get(url)
+
+        # The token and the page both come from the cache
+        with django_assert_num_queries(0):
+            second = api_client.get(url)
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data == first.data
+
+    def test_pages_and_filters_are_cached_separately(self, api_client, user, user_token, articles):
+        for article in articles:
+            UserArticle.objects.create(user=user, article=article)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+        url = reverse('article-personalized-feed')
+
+        first = api_client.get(url, {'page_size': 2})
+        second = api_client.get(url, {'page_size': 2, 'page': 2})
+
+        assert [a['id'] for a in first.data['results']] == [articles[0].id, articles[1].id]
+        assert [a['id'] for a in second.data['results']] == [articles[2].id, articles[3].id]
+
+    def test_new_link_invalidates_cached_pages(self, api_client, user, user_token, articles):
+        UserArticle.objects.create(user=user, article=articles[1])
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+        url = reverse('article-personalized-feed')
+        assert api_client.get(url).data['count'] == 1
+
+        UserArticle.objects.create(user=user, article=articles[0])
+
+        response = api_client.get(url)
+        assert response.data['count'] == 2
+        assert response.data['results'][0]['id'] == articles[0].id
+
+    def test_source_change_invalidates_cached_pages(self, api_client, user, user_token, source, articles):
+        Article.objects.filter(pk=articles[0].pk).update(source=source)
+        UserArticle.objects.create(user=user, article=articles[0])
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+        url = reverse('article-personalized-feed')
+        first = api_client.get(url)
+
+        source.name = 'BBC World'
+        source.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'][0]['source']['name'] == 'BBC World'
+
+
+@pytest.mark.django_db
+class TestArticleListSerializer:
+
+    def test_same_json_as_article_serializer(self, country, source):
+        source_with_country = Source.objects.create(
+            api_id='nz-herald', name='NZ Herald', description='News', url='https://nzherald.co.nz',
+            category='general', language='en', country=country
+        )
+        for i, article_source in enumerate([source, source_with_country, None]):
+            Article.objects.create(
+                title=f'Article {i}',
+                summary='Summary' if i else None,
+                source_name=article_source.name if article_source else None,
+                source=article_source,
+                article_url=f'https://example.com/lean-{i}',
+                image_url='https://example.com/image.png' if i else None,
+                published_at=timezone.now() - timedelta(hours=i)
+            )
+        renderer = JSONRenderer()
+
+        expected = renderer.render(ArticleSerializer(Article.objects.select_related('source__country'), many=True).data)
+        actual = renderer.render(
+            ArticleListSerializer(Article.objects.values(*ArticleListSerializer.values), many=True).data
+        )
+
+        assert actual == expected
+
+
+@pytest.mark.django_db
+class TestQueryCounts:
+
+    @pytest.fixture
+    def catalogue(self, user):
+        countries = [Country.objects.create(name=f'Country {i}', code=f'c{i}') for i in range(5)]
+        sources = [
+            Source.objects.create(api_id=f'source-{i}', name=f'Source {i}', country=countries[i % 5])
+            for i in range(30)
+        ]
+        for i in range(30):
+            article = Article.objects.create(
+                title=f'Article {i}',
+                source=sources[i],
+                source_name=sources[i].name,
+                article_url=f'https://example.com/counted-{i}',
+                published_at=timezone.now() - timedelta(hours=i)
+            )
+            UserArticle.objects.create(user=user, article=article)
+        return sources
+
+    @pytest.fixture
+    def client(self, api_client, user_token):
+        # The first request caches the token, so the counted requests below run no authentication query
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+        api_client.get(reverse('user-current'))
+        return api_client
+
+    def get_page(self, client, url_name, size, **params):
+        response = client.get(reverse(url_name), {'page_size': size, **params})
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize('url_name', ['article-list', 'article-personalized-feed'])
+    def test_article_lists(self, client, catalogue, url_name):
+        assert_queries_do_not_grow(lambda size: self.get_page(client, url_name, size))
+        assert_queries_do_not_grow(lambda size: self.get_page(client, url_name, size, pagination='cursor'))
+
+    def test_article_detail(self, client, catalogue, django_assert_num_queries):
+        article = Article.objects.first()
+
+        # Only the article with its source and country
+        with django_assert_num_queries(1):
+            client.get(reverse('article-detail', kwargs={'pk': article.pk}))
+
+    def test_preferences(self, client, user, catalogue):
+
+        def get_preferences(size):
+            response = client.get(reverse('userpreference-my-preferences'))
+            assert len(response.data['preferred_sources']) == size
+
+        def set_sources(size):
+            user.preferences.preferred_sources.set(catalogue[:size])
+            # Loads the reference-data cache outside the counted request
+            get_reference_data()
+
+        assert_queries_do_not_grow(get_preferences, sizes=(1, 10, 30), prepare=set_sources)
+
+    def test_middleware_reports_query_count(self, api_client, user_token, settings):
+        settings.DEBUG = True
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {user_token.key}')
+
+        response = api_client.get(reverse('user-current'))
+
+        assert response['X-Query-Count'] == '1'
+
+
 @pytest.mark.django_db
 class TestViewSetIntegration:
     